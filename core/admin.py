@@ -1,11 +1,109 @@
 # core/admin.py
 from django.contrib import admin
-from .models import Customer, Loan
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils.functional import cached_property
+from .models import (
+    ArchivedLoan, ChangeEventMixin, Customer, Loan, OutboxEvent, CreditPolicy, CreditPolicySlab, normalize_phone_number
+)
+
+# Below this many estimated rows an exact COUNT(*) is cheap enough to run
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that takes its count from PostgreSQL statistics instead of COUNT(*):
+    pg_class.reltuples for an unfiltered changelist and the planner's row
+    estimate for a filtered one. Small results and other databases are counted exactly.
+    """
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return super().count
+
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table]
+                )
+                estimate = cursor.fetchone()[0]
+            else:
+                sql, params = queryset.query.sql_with_params()
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                estimate = cursor.fetchone()[0][0]['Plan']['Plan Rows']
+
+        # reltuples is -1 for a table that has never been analyzed
+        if estimate < ESTIMATED_COUNT_THRESHOLD:
+            return super().count
+        return int(estimate)
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist settings for tables with millions of rows: estimated counts and
+    searches that only use indexed, exact lookups.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Indexed lookups a search term is matched against: a normalized phone number
+    # and, for all-digit terms, integer IDs
+    search_phone_field = None
+    search_id_fields = ()
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        query = Q()
+        if self.search_phone_field:
+            query |= Q(**{self.search_phone_field: normalize_phone_number(search_term)})
+        if search_term.isdigit():
+            for field in self.search_id_fields:
+                query |= Q(**{field: int(search_term)})
+        if not query:
+            return queryset.none(), False
+        return queryset.filter(query), False
+
+    def delete_queryset(self, request, queryset):
+        # The bulk delete action skips Model.delete(), which records change events
+        if not issubclass(self.model, ChangeEventMixin):
+            return super().delete_queryset(request, queryset)
+        with transaction.atomic():
+            OutboxEvent.objects.record_many(queryset, OutboxEvent.DELETED)
+            super().delete_queryset(request, queryset)
 
 @admin.register(Customer)
-class CustomerAdmin(admin.ModelAdmin):
+class CustomerAdmin(LargeTableAdmin):
     list_display = ('customer_id', 'first_name', 'last_name', 'phone_number', 'monthly_salary', 'approved_limit', 'current_debt')
+    search_fields = ('customer_id', 'phone_number')
+    search_help_text = 'Exact customer ID or phone number.'
+    search_phone_field = 'phone_normalized'
+    search_id_fields = ('customer_id',)
 
 @admin.register(Loan)
-class LoanAdmin(admin.ModelAdmin):
-    list_display = ('loan_id', 'customer', 'loan_amount', 'tenure', 'interest_rate', 'monthly_installment', 'date_of_approval', 'end_date')
\ No newline at end of file
+class LoanAdmin(LargeTableAdmin):
+    list_display = ('loan_id', 'customer', 'loan_amount', 'tenure', 'interest_rate', 'monthly_installment', 'date_of_approval', 'end_date')
+    list_select_related = ('customer',)
+    raw_id_fields = ('customer',)
+    date_hierarchy = 'date_of_approval'
+    search_fields = ('loan_id', 'customer__customer_id', 'customer__phone_number')
+    search_help_text = 'Exact loan ID, customer ID or customer phone number.'
+    search_phone_field = 'customer__phone_normalized'
+    search_id_fields = ('loan_id', 'customer_id')
+
+@admin.register(ArchivedLoan)
+class ArchivedLoanAdmin(LoanAdmin):
+    list_display = ('loan_id', 'customer', 'loan_amount', 'tenure', 'interest_rate', 'date_of_approval', 'end_date', 'archived_at')
+    date_hierarchy = None
+
+class CreditPolicySlabInline(admin.TabularInline):
+    model = CreditPolicySlab
+    extra = 0
+
+@admin.register(CreditPolicy)
+class CreditPolicyAdmin(admin.ModelAdmin):
+    list_display = ('name', 'is_active', 'paid_on_time_weight', 'loans_taken_weight', 'current_year_weight', 'volume_ratio_weight', 'updated_at')
+    inlines = [CreditPolicySlabInline]
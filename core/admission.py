@@ -0,0 +1,63 @@
+# core/admission.py
+import math
+import redis
+from django.conf import settings
+
+TOKEN_BUCKET_KEY = 'core:admission:create-loan'
+
+# Refills the bucket for the time elapsed since the last call and takes one token.
+# Runs atomically in Redis and uses the Redis clock so all web workers share one bucket.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local allowed = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+_client = None
+_token_bucket = None
+
+def get_redis():
+    global _client, _token_bucket
+
+    if _client is None:
+        _client = redis.Redis.from_url(settings.ADMISSION_REDIS_URL)
+        _token_bucket = _client.register_script(TOKEN_BUCKET_SCRIPT)
+    return _client
+
+def queue_depth():
+    """
+    Number of create-loan tasks waiting in the broker queue.
+    """
+    return get_redis().llen(settings.ASYNC_LOAN_QUEUE)
+
+def admit_loan_request():
+    """
+    Decides whether an asynchronous create-loan request may be enqueued.
+    Requests are shed while the queue is deeper than ASYNC_LOAN_MAX_QUEUE_DEPTH
+    and otherwise admitted at ASYNC_LOAN_ADMISSION_RATE per second, with bursts
+    of up to ASYNC_LOAN_ADMISSION_BURST.
+    Returns (admitted, retry_after_seconds).
+    """
+    rate = settings.ASYNC_LOAN_ADMISSION_RATE
+    depth = queue_depth()
+    if depth >= settings.ASYNC_LOAN_MAX_QUEUE_DEPTH:
+        # Roughly the time for the backlog above the threshold to drain at the admission rate
+        return False, max(1, math.ceil((depth - settings.ASYNC_LOAN_MAX_QUEUE_DEPTH + 1) / rate))
+
+    allowed, tokens = _token_bucket(keys=[TOKEN_BUCKET_KEY], args=[rate, settings.ASYNC_LOAN_ADMISSION_BURST])
+    if allowed:
+        return True, 0
+    return False, max(1, math.ceil((1 - float(tokens)) / rate))
@@ -0,0 +1,157 @@
+# core/analytics.py
+from collections import OrderedDict
+from decimal import Decimal
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Case, CharField, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast, ExtractYear, NullIf
+from django.utils import timezone
+from .credit import get_credit_policy
+from .models import Customer, Loan
+
+EXPOSURE_ANALYTICS_CACHE_KEY = 'core:exposure-analytics'
+EXPOSURE_ANALYTICS_LOCK_KEY = 'core:exposure-analytics:refresh'
+
+# Lets another request queue a refresh if a queued one never stores its result
+EXPOSURE_ANALYTICS_LOCK_SECONDS = 600
+
+# Customers scored per batch when counting credit score slabs
+ANALYTICS_CHUNK_SIZE = 2000
+
+def salary_band_labels():
+    """
+    Returns the salary band labels built from settings.EXPOSURE_SALARY_BANDS, lowest first.
+    """
+    edges = settings.EXPOSURE_SALARY_BANDS
+    labels = []
+    lower = 0
+    for edge in edges:
+        labels.append(f"{lower}-{edge}")
+        lower = edge
+    labels.append(f"{lower}+")
+    return labels
+
+def salary_band_expression(salary_field):
+    """
+    Database-side CASE expression mapping a monthly salary column to its band label.
+    """
+    labels = salary_band_labels()
+    whens = [
+        When(**{f"{salary_field}__lt": edge}, then=Value(label))
+        for edge, label in zip(settings.EXPOSURE_SALARY_BANDS, labels)
+    ]
+    return Case(*whens, default=Value(labels[-1]), output_field=CharField())
+
+def compute_exposure_analytics():
+    """
+    Aggregates portfolio exposure in the database.
+
+    Active loan volume and EMI burden are grouped by salary band and approval
+    year; credit score slabs are grouped by salary band.
+    """
+    today = timezone.now().date()
+    active = Q(emis_paid_on_time__lt=F('tenure'), end_date__gte=today)
+
+    exposure_rows = (
+        Loan.objects
+        .annotate(
+            salary_band=salary_band_expression('customer__monthly_salary'),
+            approval_year=ExtractYear('date_of_approval'),
+        )
+        .values('salary_band', 'approval_year')
+        .annotate(
+            active_loans=Count('loan_id', filter=active),
+            active_loan_volume=Sum('loan_amount', filter=active),
+            active_monthly_installments=Sum('monthly_installment', filter=active),
+            avg_emi_to_salary=Avg(
+                Cast('monthly_installment', FloatField()) / NullIf(Cast('customer__monthly_salary', FloatField()), 0.0),
+                filter=active
+            ),
+        )
+        .order_by('salary_band', 'approval_year')
+    )
+    exposure = [
+        {
+            "salary_band": row['salary_band'],
+            "approval_year": row['approval_year'],
+            "active_loans": row['active_loans'],
+            "active_loan_volume": row['active_loan_volume'] or Decimal('0.00'),
+            "active_monthly_installments": row['active_monthly_installments'] or Decimal('0.00'),
+            "avg_emi_to_salary": round(row['avg_emi_to_salary'] or 0.0, 4),
+        }
+        for row in exposure_rows
+    ]
+
+    # Per-customer loan aggregates in a single grouped query, scored in Python
+    policy = get_credit_policy()
+    slabs = OrderedDict(
+        (band, OrderedDict((label, 0) for label in reversed(policy.labels)))
+        for band in salary_band_labels()
+    )
+    customer_rows = (
+        Customer.objects
+        .annotate(
+            salary_band=salary_band_expression('monthly_salary'),
+            past_loans_paid_on_time=Count(
+                'loans', filter=Q(loans__emis_paid_on_time__gte=F('loans__tenure'), loans__end_date__lt=today)
+            ),
+            total_loans_taken=Count('loans'),
+            loans_this_year=Count('loans', filter=Q(loans__date_of_approval__year=today.year)),
+            total_active_loan_amount=Sum(
+                'loans__loan_amount', filter=Q(loans__emis_paid_on_time__lt=F('loans__tenure'), loans__end_date__gte=today)
+            ),
+        )
+        .values(
+            'salary_band', 'approved_limit', 'past_loans_paid_on_time',
+            'total_loans_taken', 'loans_this_year', 'total_active_loan_amount',
+            'archived_loan_count'
+        )
+    )
+    chunk = []
+    for row in customer_rows.iterator(chunk_size=ANALYTICS_CHUNK_SIZE):
+        row['total_active_loan_amount'] = row['total_active_loan_amount'] or Decimal('0.00')
+        # Archived loans were closed and paid on time before this year
+        row['past_loans_paid_on_time'] += row['archived_loan_count']
+        row['total_loans_taken'] += row['archived_loan_count']
+        chunk.append(row)
+        if len(chunk) == ANALYTICS_CHUNK_SIZE:
+            _count_slabs(policy, chunk, slabs)
+            chunk = []
+    _count_slabs(policy, chunk, slabs)
+
+    return {
+        "generated_at": timezone.now().isoformat(),
+        "refresh_interval": settings.EXPOSURE_ANALYTICS_REFRESH_SECONDS,
+        "exposure": exposure,
+        "credit_score_slabs": [
+            {"salary_band": band, "customers": counts}
+            for band, counts in slabs.items()
+        ],
+    }
+
+def _count_slabs(policy, rows, slabs):
+    for row, credit_score in zip(rows, policy.score_many(rows)):
+        slabs[row['salary_band']][policy.slab_label(credit_score)] += 1
+
+def refresh_exposure_analytics():
+    """
+    Recomputes the exposure analytics and stores them in the cache without an
+    expiry, so a late or missed beat run keeps serving the previous result.
+    """
+    data = compute_exposure_analytics()
+    cache.set(EXPOSURE_ANALYTICS_CACHE_KEY, data, timeout=None)
+    cache.delete(EXPOSURE_ANALYTICS_LOCK_KEY)
+    return data
+
+def get_exposure_analytics():
+    """
+    Returns the cached exposure analytics, or None if they have not been computed yet.
+    """
+    return cache.get(EXPOSURE_ANALYTICS_CACHE_KEY)
+
+def claim_exposure_refresh():
+    """
+    Returns True for the one caller that should queue a refresh on a cold
+    cache. The claim is released when the refresh stores its result.
+    """
+    return cache.add(EXPOSURE_ANALYTICS_LOCK_KEY, True, timeout=EXPOSURE_ANALYTICS_LOCK_SECONDS)
@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'core'
\ No newline at end of file
+    name = 'core'
+
+    def ready(self):
+        # Register the signal handlers that reload the credit policy
+        from . import credit  # noqa: F401
@@ -0,0 +1,64 @@
+# core/archival.py
+from collections import Counter, defaultdict
+from datetime import date
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import ArchivedLoan, Customer, Loan, OutboxEvent
+
+# Loans moved per transaction by the archival job
+ARCHIVE_BATCH_SIZE = 1000
+
+ARCHIVED_FIELDS = [
+    'loan_id', 'customer_id', 'loan_amount', 'tenure', 'interest_rate',
+    'monthly_installment', 'emis_paid_on_time', 'date_of_approval', 'end_date',
+]
+
+def archivable_loans(today=None):
+    """
+    Loans that are fully repaid, have ended and were approved before the current
+    year. Such a loan only ever adds one to the customer's loans taken and loans
+    paid on time, so a counter can replace it in the credit score.
+    """
+    today = today or timezone.now().date()
+    return Loan.objects.filter(
+        Q(date_of_approval__lt=date(today.year, 1, 1)) | Q(date_of_approval__isnull=True),
+        emis_paid_on_time__gte=F('tenure'),
+        end_date__lt=today,
+    )
+
+def archive_closed_loans(batch_size=ARCHIVE_BATCH_SIZE, today=None):
+    """
+    Moves archivable loans to ArchivedLoan batch by batch and adds them to
+    their customers' archived_loan_count. Each batch is one transaction, so a
+    loan is counted exactly when it leaves the Loan table.
+    Returns the number of loans archived.
+    """
+    archived = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                archivable_loans(today)
+                .select_for_update(skip_locked=True)
+                .order_by('loan_id')
+                .values(*ARCHIVED_FIELDS)[:batch_size]
+            )
+            if not rows:
+                return archived
+
+            ArchivedLoan.objects.bulk_create([ArchivedLoan(**row) for row in rows])
+            OutboxEvent.objects.record_many([Loan(**row) for row in rows], OutboxEvent.ARCHIVED)
+
+            # One UPDATE per distinct number of loans archived for a customer
+            customers_by_count = defaultdict(list)
+            for customer_id, count in Counter(row['customer_id'] for row in rows).items():
+                customers_by_count[count].append(customer_id)
+            for count, customer_ids in customers_by_count.items():
+                Customer.objects.filter(customer_id__in=customer_ids).update(
+                    archived_loan_count=F('archived_loan_count') + count
+                )
+
+            Loan.objects.filter(loan_id__in=[row['loan_id'] for row in rows]).delete()
+        archived += len(rows)
+        if len(rows) < batch_size:
+            return archived
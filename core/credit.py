@@ -0,0 +1,196 @@
+# core/credit.py
+import time
+from bisect import bisect_left
+from decimal import Decimal
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from redis import RedisError
+from .models import CreditPolicy, CreditPolicySlab
+
+CREDIT_POLICY_VERSION_CACHE_KEY = 'core:credit-policy-version'
+
+# Used when no policy is marked active. Slabs are (min_credit_score, approve, min_interest_rate).
+DEFAULT_WEIGHTS = {
+    'paid_on_time_weight': 5,
+    'loans_taken_weight': -5,
+    'current_year_weight': 3,
+    'volume_ratio_weight': 10,
+}
+DEFAULT_SLABS = [
+    (Decimal('10.00'), True, Decimal('16.00')),
+    (Decimal('30.00'), True, Decimal('12.00')),
+    (Decimal('50.00'), True, None),
+]
+
+class CompiledCreditPolicy:
+    """
+    In-memory form of a credit policy. Scores customers from their loan
+    aggregates and finds the slab for a score with a bisect over the slab bounds.
+    """
+    def __init__(self, weights, slabs):
+        self.paid_on_time_weight = weights['paid_on_time_weight']
+        self.loans_taken_weight = weights['loans_taken_weight']
+        self.current_year_weight = weights['current_year_weight']
+        self.volume_ratio_weight = weights['volume_ratio_weight']
+
+        slabs = sorted(slabs, key=lambda slab: slab[0])
+        self.bounds = [bound for bound, _, _ in slabs]
+        # outcomes[i] applies to bounds[i - 1] < score <= bounds[i]; below the lowest bound nothing is approved
+        self.outcomes = [(False, None)] + [(approve, min_rate) for _, approve, min_rate in slabs]
+        self.labels = [self._label(index) for index in range(len(self.outcomes))]
+
+    def _label(self, index):
+        bounds = [f"{bound.normalize():f}" for bound in self.bounds]
+        if not bounds:
+            return 'all'
+        if index == 0:
+            return f"{bounds[0]}_or_below"
+        if index == len(bounds):
+            return f"above_{bounds[-1]}"
+        return f"{bounds[index - 1]}_to_{bounds[index]}"
+
+    def score(self, approved_limit, past_loans_paid_on_time, total_loans_taken, loans_this_year, total_active_loan_amount):
+        """
+        Scores a customer out of 100 from their loan history aggregates. The
+        amounts only need to share a unit; with integer paise the whole score
+        is integer arithmetic. The volume term is truncated toward zero.
+        """
+        credit_score = 100
+        credit_score += past_loans_paid_on_time * self.paid_on_time_weight
+        credit_score += total_loans_taken * self.loans_taken_weight
+        credit_score += loans_this_year * self.current_year_weight
+
+        if total_active_loan_amount > approved_limit:
+            credit_score = 0
+        elif approved_limit > 0:
+            volume_points = abs(total_active_loan_amount * self.volume_ratio_weight) // approved_limit
+            if self.volume_ratio_weight < 0:
+                volume_points = -volume_points
+            credit_score += int(volume_points)
+
+        return max(0, min(100, credit_score))
+
+    def score_many(self, rows):
+        """
+        Scores a batch of aggregate dicts keyed like the arguments of score().
+        """
+        score = self.score
+        return [
+            score(
+                row['approved_limit'],
+                row['past_loans_paid_on_time'],
+                row['total_loans_taken'],
+                row['loans_this_year'],
+                row['total_active_loan_amount']
+            )
+            for row in rows
+        ]
+
+    def slab(self, credit_score):
+        """
+        Index of the slab the credit score falls into.
+        """
+        return bisect_left(self.bounds, credit_score)
+
+    def slab_label(self, credit_score):
+        return self.labels[self.slab(credit_score)]
+
+    def evaluate(self, credit_score, interest_rate):
+        """
+        Applies the slab rules to a credit score and requested interest rate.
+        Returns (approval, corrected_interest_rate, message).
+        """
+        approve, min_rate = self.outcomes[self.slab(credit_score)]
+        corrected_interest_rate = Decimal(str(interest_rate))
+        message = ""
+        if not approve:
+            lowest = f"{self.bounds[0].normalize():f}" if self.bounds else "the minimum"
+            return False, corrected_interest_rate, f"Loan not approved due to low credit score (below {lowest})."
+        if min_rate is not None and corrected_interest_rate < min_rate:
+            corrected_interest_rate = min_rate
+            message = f"Interest rate corrected to {corrected_interest_rate}% (minimum for this credit score slab)."
+        return True, corrected_interest_rate, message
+
+def compile_credit_policy():
+    """
+    Loads the active policy from the database and compiles it.
+    """
+    policy = CreditPolicy.objects.filter(is_active=True).order_by('-updated_at').first()
+    if policy is None:
+        return CompiledCreditPolicy(DEFAULT_WEIGHTS, DEFAULT_SLABS)
+    weights = {name: getattr(policy, name) for name in DEFAULT_WEIGHTS}
+    slabs = [
+        (slab.min_credit_score, slab.approve, slab.min_interest_rate)
+        for slab in policy.slabs.all()
+    ]
+    return CompiledCreditPolicy(weights, slabs)
+
+# Recorded as the compiled version while the cache is unreachable. It never equals
+# a cached version, so the policy is recompiled once the cache is back.
+VERSION_UNAVAILABLE = object()
+
+# Compiled policy of this process, the version it was compiled at and when the version was last checked
+_compiled_policy = None
+_compiled_version = None
+_version_checked_at = 0.0
+
+def get_credit_policy():
+    """
+    Returns the compiled active policy. The shared version counter in the cache
+    is read at most every CREDIT_POLICY_CHECK_SECONDS and the database only when
+    it has changed, so the hot path normally does no I/O at all.
+    """
+    global _compiled_policy, _compiled_version, _version_checked_at
+
+    now = time.monotonic()
+    if _compiled_policy is not None and now - _version_checked_at < settings.CREDIT_POLICY_CHECK_SECONDS:
+        return _compiled_policy
+
+    _version_checked_at = now
+    try:
+        version = cache.get(CREDIT_POLICY_VERSION_CACHE_KEY)
+    except RedisError:
+        # Eligibility checks do not depend on the cache: keep serving the compiled
+        # policy, and recompile once the version can be read again in case a
+        # change was saved while it could not be bumped
+        if _compiled_policy is None:
+            _compiled_policy = compile_credit_policy()
+        _compiled_version = VERSION_UNAVAILABLE
+        return _compiled_policy
+    if _compiled_policy is None or version != _compiled_version:
+        _compiled_policy = compile_credit_policy()
+        _compiled_version = version
+    return _compiled_policy
+
+def invalidate_credit_policy():
+    """
+    Drops this process's compiled policy and bumps the shared version so other
+    workers recompile on their next check.
+    """
+    global _compiled_policy
+
+    _compiled_policy = None
+    bump_credit_policy_version()
+
+def bump_credit_policy_version():
+    try:
+        try:
+            cache.incr(CREDIT_POLICY_VERSION_CACHE_KEY)
+        except ValueError:
+            cache.set(CREDIT_POLICY_VERSION_CACHE_KEY, 1, timeout=None)
+    except RedisError:
+        # The change is saved; workers that could not read the version either
+        # recompile when the cache is back
+        pass
+
+@receiver([post_save, post_delete], sender=CreditPolicy)
+@receiver([post_save, post_delete], sender=CreditPolicySlab)
+def credit_policy_changed(sender, **kwargs):
+    global _compiled_policy
+
+    # This process sees the change right away; other workers once it is committed
+    _compiled_policy = None
+    transaction.on_commit(bump_credit_policy_version)
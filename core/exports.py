@@ -0,0 +1,120 @@
+# core/exports.py
+import csv
+from .models import Customer, Loan
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_DATASETS = {
+    'customers': [
+        'customer_id', 'first_name', 'last_name', 'age', 'phone_number',
+        'monthly_salary', 'approved_limit', 'current_debt',
+    ],
+    'loans': [
+        'loan_id', 'customer_id', 'loan_amount', 'tenure', 'interest_rate',
+        'monthly_installment', 'emis_paid_on_time', 'date_of_approval', 'end_date',
+    ],
+}
+
+class Echo:
+    """
+    File-like object whose write() hands the line back instead of buffering it.
+    """
+    def write(self, value):
+        return value
+
+def export_queryset(dataset, approved_from=None, approved_to=None):
+    """
+    Returns the values_list queryset for an export dataset.
+    Customers are filtered on the approval dates of their loans.
+    """
+    loan_filters = {}
+    if approved_from:
+        loan_filters['date_of_approval__gte'] = approved_from
+    if approved_to:
+        loan_filters['date_of_approval__lte'] = approved_to
+
+    if dataset == 'customers':
+        queryset = Customer.objects.all()
+        if loan_filters:
+            queryset = queryset.filter(
+                customer_id__in=Loan.objects.filter(**loan_filters).values('customer_id')
+            )
+        queryset = queryset.order_by('customer_id')
+    elif dataset == 'loans':
+        queryset = Loan.objects.filter(**loan_filters).order_by('loan_id')
+    else:
+        raise ValueError(f"Unknown export dataset: {dataset}")
+    return queryset.values_list(*EXPORT_DATASETS[dataset])
+
+def iter_csv_lines(dataset, approved_from=None, approved_to=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields the export as CSV lines, reading rows through a server-side cursor.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_DATASETS[dataset])
+    rows = export_queryset(dataset, approved_from, approved_to).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield writer.writerow(row)
+
+def parquet_schema(dataset):
+    """
+    Arrow schema for an export dataset. pyarrow is only needed for Parquet exports.
+    """
+    import pyarrow as pa
+
+    money = pa.decimal128(12, 2)
+    if dataset == 'customers':
+        return pa.schema([
+            ('customer_id', pa.int64()),
+            ('first_name', pa.string()),
+            ('last_name', pa.string()),
+            ('age', pa.int32()),
+            ('phone_number', pa.string()),
+            ('monthly_salary', money),
+            ('approved_limit', money),
+            ('current_debt', money),
+        ])
+    return pa.schema([
+        ('loan_id', pa.int64()),
+        ('customer_id', pa.int64()),
+        ('loan_amount', money),
+        ('tenure', pa.int32()),
+        ('interest_rate', pa.decimal128(5, 2)),
+        ('monthly_installment', money),
+        ('emis_paid_on_time', pa.int32()),
+        ('date_of_approval', pa.date32()),
+        ('end_date', pa.date32()),
+    ])
+
+def write_parquet(path, dataset, approved_from=None, approved_to=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Writes the export to a Parquet file, one row group per chunk of rows.
+    Returns the number of rows written.
+    """
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema(dataset)
+    rows = export_queryset(dataset, approved_from, approved_to).iterator(chunk_size=chunk_size)
+    total = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                writer.write_table(_rows_to_table(chunk, schema))
+                total += len(chunk)
+                chunk = []
+        if chunk:
+            writer.write_table(_rows_to_table(chunk, schema))
+            total += len(chunk)
+    return total
+
+def _rows_to_table(rows, schema):
+    import pyarrow as pa
+
+    columns = list(zip(*rows))
+    return pa.Table.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema
+    )
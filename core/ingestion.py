@@ -0,0 +1,68 @@
+# core/ingestion.py
+import os
+
+# Columns read from the customer and loan files, with their parse dtypes.
+# Dates are left to pandas so Excel and Parquet keep their native date types.
+CUSTOMER_COLUMNS = {
+    "Customer ID": "int64",
+    "id": "int64",
+    "First Name": "str",
+    "Last Name": "str",
+    "Age": "int64",
+    "Phone Number": "int64",
+    "Monthly Salary": "float64",
+    "Approved Limit": "float64",
+}
+
+LOAN_COLUMNS = {
+    "Customer ID": "int64",
+    "Loan ID": "int64",
+    "Loan Amount": "float64",
+    "Tenure": "int64",
+    "Interest Rate": "float64",
+    "Monthly payment": "float64",
+    "EMIs paid on Time": "int64",
+    "Date of Approval": None,
+    "End Date": None,
+}
+
+FILE_FORMATS = {
+    '.xlsx': 'excel',
+    '.xls': 'excel',
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+}
+
+def detect_format(path):
+    """
+    Returns 'excel', 'csv' or 'parquet' based on the file extension.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        return FILE_FORMATS[extension]
+    except KeyError:
+        raise ValueError(f"Unsupported file format '{extension}' for {path}. Use one of: {', '.join(sorted(FILE_FORMATS))}.")
+
+def read_ingestion_file(path, columns):
+    """
+    Reads an ingestion file into a DataFrame, materializing only the given
+    columns. `columns` maps column names to dtypes (None to let the reader decide);
+    columns missing from the file are skipped.
+    """
+    # pandas is imported here rather than at module level so that web and
+    # worker processes only pay for it once an ingestion actually runs
+    import pandas as pd
+
+    file_format = detect_format(path)
+    dtypes = {name: dtype for name, dtype in columns.items() if dtype is not None}
+    wanted = lambda name: name in columns
+
+    if file_format == 'csv':
+        return pd.read_csv(path, usecols=wanted, dtype=dtypes)
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+
+        available = pq.read_schema(path).names
+        return pd.read_parquet(path, columns=[name for name in available if name in columns])
+    return pd.read_excel(path, usecols=wanted, dtype=dtypes)
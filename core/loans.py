@@ -0,0 +1,216 @@
+# core/loans.py
+from rest_framework import status
+from django.db import transaction
+from django.db.models import BigIntegerField, Sum, F
+from django.utils import timezone
+from decimal import Decimal
+from .models import Customer, Loan, OutboxEvent
+from .credit import get_credit_policy
+from .money import (
+    divide_half_even,
+    from_paise,
+    installment_factor,
+    monthly_installment_paise,
+    to_basis_points,
+    to_paise
+)
+
+EMI_LIMIT_MESSAGE = "Loan not approved. Sum of current EMIs exceeds 50% of monthly salary."
+APPROVED_LIMIT_MESSAGE = "Loan not approved. Requested loan amount exceeds customer's approved limit."
+
+def get_eligibility_profile(customer):
+    """
+    Loads the parts of the eligibility check that depend only on the customer,
+    with amounts in integer paise. One profile serves any number of requested loans.
+    """
+    profile = {
+        "monthly_salary": to_paise(customer.monthly_salary),
+        "approved_limit": to_paise(customer.approved_limit),
+        "emi_limit_exceeded": False,
+        "credit_score": None
+    }
+
+    # Sums of raw paise, skipping the conversion to Decimal rupees
+    active_loans = Loan.objects.filter(
+        customer=customer,
+        emis_paid_on_time__lt=F('tenure'),
+        end_date__gte=timezone.now().date()
+    )
+    active_totals = active_loans.aggregate(
+        total_current_emi=Sum('monthly_installment', output_field=BigIntegerField()),
+        total_active_loan_amount=Sum('loan_amount', output_field=BigIntegerField())
+    )
+    total_current_emi = int(active_totals['total_current_emi'] or 0)
+
+    # Check sum of all current EMIs > 50% of monthly salary
+    if 2 * total_current_emi > profile["monthly_salary"]:
+        profile["emi_limit_exceeded"] = True
+        return profile
+
+    # Past Loans paid on time (consider only closed loans for this metric)
+    # Archived loans are all closed and paid on time, and are only kept as a count
+    past_loans_paid_on_time = Loan.objects.filter(
+        customer=customer,
+        emis_paid_on_time__gte=F('tenure'),
+        end_date__lt=timezone.now().date()
+    ).count() + customer.archived_loan_count
+    
+    # No of loans taken in past (total loans, active or closed)
+    total_loans_taken = Loan.objects.filter(customer=customer).count() + customer.archived_loan_count
+    
+    # Loan activity in current year (number of loans approved in current year)
+    current_year = timezone.now().year
+    loans_this_year = Loan.objects.filter(customer=customer, date_of_approval__year=current_year).count()
+    
+    # Loan approved volume (sum of all current active loans)
+    total_active_loan_amount = int(active_totals['total_active_loan_amount'] or 0)
+    
+    profile["credit_score"] = get_credit_policy().score(
+        profile["approved_limit"],
+        past_loans_paid_on_time,
+        total_loans_taken,
+        loans_this_year,
+        total_active_loan_amount
+    )
+    return profile
+
+def calculate_eligibility(customer, loan_amount, interest_rate, tenure):
+    """
+    Helper function to calculate eligibility and credit score.
+    Returns a dictionary of eligibility data.
+    Amounts are compared and the EMI is computed in integer paise.
+    """
+    profile = get_eligibility_profile(customer)
+    if profile["emi_limit_exceeded"]:
+        return {
+            "approval": False,
+            "message": EMI_LIMIT_MESSAGE,
+            "corrected_interest_rate": float(interest_rate),
+            "monthly_installment": 0
+        }
+
+    # Eligibility based on credit score and interest rate rules
+    approval, corrected_interest_rate, message = get_credit_policy().evaluate(profile["credit_score"], interest_rate)
+        
+    principal = to_paise(loan_amount)
+    if principal > profile["approved_limit"]:
+        approval = False
+        message = APPROVED_LIMIT_MESSAGE
+        
+    monthly_installment = 0
+    if approval:
+        monthly_installment = monthly_installment_paise(principal, to_basis_points(corrected_interest_rate), tenure)
+            
+    return {
+        "approval": approval,
+        "message": message,
+        "corrected_interest_rate": float(corrected_interest_rate),
+        "monthly_installment": from_paise(monthly_installment)
+    }
+
+def calculate_eligibility_grid(customer, loan_amounts, interest_rates, tenures):
+    """
+    Runs the eligibility check for every combination of loan amount, interest
+    rate and tenure. The customer's loans are queried once, the slab rules run
+    once per rate and the EMI factor is computed once per rate and tenure, so
+    each cell is a single integer multiply and divide.
+    Returns approval as an [amount][rate] matrix and EMIs as an
+    [amount][rate][tenure] matrix, with None where the loan is not approved.
+    """
+    profile = get_eligibility_profile(customer)
+    policy = get_credit_policy()
+
+    if profile["emi_limit_exceeded"]:
+        rate_outcomes = [(False, Decimal(str(rate)), EMI_LIMIT_MESSAGE) for rate in interest_rates]
+    else:
+        rate_outcomes = [policy.evaluate(profile["credit_score"], rate) for rate in interest_rates]
+    # The slab decision depends on the credit score alone, so it is the same for every rate
+    message = "" if rate_outcomes[0][0] else rate_outcomes[0][2]
+
+    factors = [
+        [installment_factor(to_basis_points(corrected_rate), tenure) for tenure in tenures]
+        for _, corrected_rate, _ in rate_outcomes
+    ]
+
+    approval = []
+    monthly_installments = []
+    for principal in (to_paise(amount) for amount in loan_amounts):
+        within_limit = principal <= profile["approved_limit"]
+        approval_row = []
+        installment_row = []
+        for (approved, _, _), rate_factors in zip(rate_outcomes, factors):
+            approved = approved and within_limit
+            approval_row.append(approved)
+            # paise / 100 is the same float as float(from_paise(paise)), without building a Decimal
+            installment_row.append([
+                divide_half_even(principal * numerator, denominator) / 100 if approved else None
+                for numerator, denominator in rate_factors
+            ])
+        approval.append(approval_row)
+        monthly_installments.append(installment_row)
+
+    return {
+        "approved_limit": from_paise(profile["approved_limit"]),
+        "corrected_interest_rates": [float(corrected_rate) for _, corrected_rate, _ in rate_outcomes],
+        "approval": approval,
+        "monthly_installments": monthly_installments,
+        "message": message
+    }
+
+def create_loan(customer_id, loan_amount, interest_rate, tenure):
+    """
+    Checks eligibility and creates the loan if approved. Shared by the
+    create-loan API and its asynchronous Celery task.
+    Returns (response_data, status_code).
+    """
+    try:
+        customer = Customer.objects.get(customer_id=customer_id)
+    except Customer.DoesNotExist:
+        return {"error": "Customer not found."}, status.HTTP_404_NOT_FOUND
+
+    eligibility_data = calculate_eligibility(
+        customer, 
+        loan_amount, 
+        interest_rate, 
+        tenure
+    )
+
+    if not eligibility_data['approval']:
+        return {
+            "loan_id": None,
+            "customer_id": customer.customer_id,
+            "loan_approved": False,
+            "message": eligibility_data["message"],
+            "monthly_installment": None
+        }, status.HTTP_200_OK
+
+    corrected_interest_rate = Decimal(str(eligibility_data.get('corrected_interest_rate', interest_rate)))
+    monthly_installment = Decimal(str(eligibility_data.get('monthly_installment', Decimal('0.00'))))
+
+    with transaction.atomic():
+        loan = Loan.objects.create(
+            customer=customer,
+            loan_amount=loan_amount,
+            tenure=tenure,
+            interest_rate=corrected_interest_rate,
+            monthly_installment=monthly_installment,
+            date_of_approval=timezone.now().date(),
+            end_date=timezone.now().date() + timezone.timedelta(days=30 * tenure),
+            emis_paid_on_time=0
+        )
+
+        # Only the debt is written, in paise, so counters changed since the
+        # customer was loaded (such as archived_loan_count) are not overwritten
+        Customer.objects.filter(customer_id=customer.customer_id).update(
+            current_debt=F('current_debt') + to_paise(loan_amount)
+        )
+        customer.refresh_from_db(fields=['current_debt'])
+        OutboxEvent.objects.record(customer, OutboxEvent.UPDATED)
+
+    return {
+        "loan_id": loan.loan_id,
+        "customer_id": customer.customer_id,
+        "loan_approved": True,
+        "message": "Loan approved successfully.",
+        "monthly_installment": round(monthly_installment, 2)
+    }, status.HTTP_201_CREATED
@@ -0,0 +1,40 @@
+# core/management/commands/export_data.py
+from django.core.management.base import BaseCommand, CommandError
+from core.exports import EXPORT_CHUNK_SIZE, EXPORT_DATASETS, iter_csv_lines, write_parquet
+from datetime import date
+
+class Command(BaseCommand):
+    help = 'Export customers or loans to a CSV or Parquet file with constant memory use.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset', choices=sorted(EXPORT_DATASETS), required=True, help='Table to export.')
+        parser.add_argument('--format', choices=['csv', 'parquet'], default='csv', help='Output file format.')
+        parser.add_argument('--output', type=str, required=True, help='Path of the file to write.')
+        parser.add_argument('--approved_from', type=date.fromisoformat, help='Only loans approved on or after this date (YYYY-MM-DD).')
+        parser.add_argument('--approved_to', type=date.fromisoformat, help='Only loans approved on or before this date (YYYY-MM-DD).')
+        parser.add_argument('--chunk_size', type=int, default=EXPORT_CHUNK_SIZE, help='Rows per cursor fetch and Parquet row group.')
+
+    def handle(self, *args, **options):
+        dataset = options['dataset']
+        output = options['output']
+        filters = {
+            'approved_from': options['approved_from'],
+            'approved_to': options['approved_to'],
+            'chunk_size': options['chunk_size'],
+        }
+
+        self.stdout.write(self.style.NOTICE(f"Exporting {dataset} to {output}..."))
+
+        if options['format'] == 'parquet':
+            try:
+                total = write_parquet(output, dataset, **filters)
+            except ImportError:
+                raise CommandError('Parquet export requires pyarrow to be installed.')
+        else:
+            total = -1  # header line
+            with open(output, 'w', newline='') as f:
+                for line in iter_csv_lines(dataset, **filters):
+                    f.write(line)
+                    total += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Exported {total} {dataset} rows to {output}."))
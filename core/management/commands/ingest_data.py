@@ -1,27 +1,35 @@
 # core/management/commands/ingest_data.py
 from django.core.management.base import BaseCommand
 from core.tasks import ingest_customer_and_loan_data
-import os
+from core.ingestion import detect_format
 
 class Command(BaseCommand):
-    help = 'Ingest customer and loan data from Excel files using a Celery background task.'
+    help = 'Ingest customer and loan data from Excel, CSV or Parquet files using a Celery background task.'
 
     def add_arguments(self, parser):
-        parser.add_argument('--customer_xlsx', type=str, help='Path to the customer Excel file.')
-        parser.add_argument('--loan_xlsx', type=str, help='Path to the loan Excel file.')
+        parser.add_argument('--customer_file', '--customer_xlsx', dest='customer_file', type=str, help='Path to the customer .xlsx, .csv or .parquet file.')
+        parser.add_argument('--loan_file', '--loan_xlsx', dest='loan_file', type=str, help='Path to the loan .xlsx, .csv or .parquet file.')
+        parser.add_argument('--incremental', action='store_true', help='Only write rows that are new or changed since the last ingestion.')
 
     def handle(self, *args, **options):
-        customer_xlsx_path = options['customer_xlsx']
-        loan_xlsx_path = options['loan_xlsx']
+        customer_path = options['customer_file']
+        loan_path = options['loan_file']
 
-        if not customer_xlsx_path or not loan_xlsx_path:
-            self.stdout.write(self.style.ERROR('Both --customer_xlsx and --loan_xlsx arguments are required.'))
+        if not customer_path or not loan_path:
+            self.stdout.write(self.style.ERROR('Both --customer_file and --loan_file arguments are required.'))
             return
 
+        for path in (customer_path, loan_path):
+            try:
+                detect_format(path)
+            except ValueError as e:
+                self.stdout.write(self.style.ERROR(str(e)))
+                return
+
         self.stdout.write(self.style.NOTICE("Starting data ingestion task..."))
         
         # Trigger the Celery task and get the task ID
-        task_result = ingest_customer_and_loan_data.delay(customer_xlsx_path, loan_xlsx_path)
+        task_result = ingest_customer_and_loan_data.delay(customer_path, loan_path, incremental=options['incremental'])
 
         self.stdout.write(self.style.SUCCESS(f"Ingestion task triggered with ID: {task_result.id}"))
         self.stdout.write(self.style.NOTICE("Check worker logs for progress. Data will be available in the admin panel upon completion."))
\ No newline at end of file
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:05
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def create_default_policy(apps, schema_editor):
+    # Seed the rules that were hard-coded in calculate_eligibility
+    CreditPolicy = apps.get_model('core', 'CreditPolicy')
+    CreditPolicySlab = apps.get_model('core', 'CreditPolicySlab')
+    policy = CreditPolicy.objects.create(name='Default', is_active=True)
+    CreditPolicySlab.objects.bulk_create([
+        CreditPolicySlab(policy=policy, min_credit_score=Decimal('10.00'), min_interest_rate=Decimal('16.00')),
+        CreditPolicySlab(policy=policy, min_credit_score=Decimal('30.00'), min_interest_rate=Decimal('12.00')),
+        CreditPolicySlab(policy=policy, min_credit_score=Decimal('50.00')),
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_remove_loan_monthly_payment_remove_loan_start_date_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CreditPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('is_active', models.BooleanField(default=False)),
+                ('paid_on_time_weight', models.IntegerField(default=5, help_text='Added per closed loan paid on time')),
+                ('loans_taken_weight', models.IntegerField(default=-5, help_text='Added per loan taken')),
+                ('current_year_weight', models.IntegerField(default=3, help_text='Added per loan approved in the current year')),
+                ('volume_ratio_weight', models.IntegerField(default=10, help_text='Multiplied by active loan volume / approved limit')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'credit policies',
+            },
+        ),
+        migrations.CreateModel(
+            name='CreditPolicySlab',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_credit_score', models.DecimalField(decimal_places=2, help_text='Applies to scores strictly above this value', max_digits=5, verbose_name='credit score above')),
+                ('approve', models.BooleanField(default=True)),
+                ('min_interest_rate', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('policy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slabs', to='core.creditpolicy')),
+            ],
+            options={
+                'ordering': ['min_credit_score'],
+                'constraints': [models.UniqueConstraint(fields=('policy', 'min_credit_score'), name='unique_policy_slab_bound')],
+            },
+        ),
+        migrations.RunPython(create_default_policy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:08
+
+import re
+from django.db import migrations, models
+
+BACKFILL_BATCH_SIZE = 2000
+
+
+def normalize_phone_number(phone_number):
+    # Copy of core.models.normalize_phone_number as of this migration
+    digits = re.sub(r'\D', '', str(phone_number))
+    if len(digits) == 12 and digits.startswith('91'):
+        return digits[2:]
+    if len(digits) == 11 and digits.startswith('0'):
+        return digits[1:]
+    return digits
+
+
+def backfill_phone_normalized(apps, schema_editor):
+    Customer = apps.get_model('core', 'Customer')
+    customers = Customer.objects.only('customer_id', 'phone_number').order_by('customer_id')
+    batch = []
+    for customer in customers.iterator(chunk_size=BACKFILL_BATCH_SIZE):
+        customer.phone_normalized = normalize_phone_number(customer.phone_number)
+        batch.append(customer)
+        if len(batch) == BACKFILL_BATCH_SIZE:
+            Customer.objects.bulk_update(batch, ['phone_normalized'])
+            batch = []
+    if batch:
+        Customer.objects.bulk_update(batch, ['phone_normalized'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_credit_policy'),
+    ]
+
+    operations = [
+        # The index is added after the backfill so it is built once instead of maintained row by row
+        migrations.AddField(
+            model_name='customer',
+            name='phone_normalized',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_phone_normalized, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='customer',
+            name='phone_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=20),
+        ),
+    ]
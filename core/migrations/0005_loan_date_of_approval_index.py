@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_customer_phone_normalized'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='loan',
+            name='date_of_approval',
+            field=models.DateField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:40
+
+import core.money
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import F, Value
+from django.db.models.functions import Cast, Round
+
+# (model, field) pairs moved from DecimalField rupees to integer paise
+MONEY_FIELDS = [
+    ('customer', 'monthly_salary'),
+    ('customer', 'approved_limit'),
+    ('customer', 'current_debt'),
+    ('loan', 'loan_amount'),
+    ('loan', 'monthly_installment'),
+]
+
+
+def copy_rupees_to_paise(apps, schema_editor):
+    # One UPDATE per table; rounding before the cast keeps SQLite from storing floats
+    for model_name in ('customer', 'loan'):
+        model = apps.get_model('core', model_name)
+        model.objects.update(**{
+            f'{field}_paise': Cast(Round(F(field) * 100), models.BigIntegerField())
+            for name, field in MONEY_FIELDS if name == model_name
+        })
+
+
+def copy_paise_to_rupees(apps, schema_editor):
+    for model_name in ('customer', 'loan'):
+        model = apps.get_model('core', model_name)
+        model.objects.update(**{
+            field: F(f'{field}_paise') * Value(Decimal('0.01'))
+            for name, field in MONEY_FIELDS if name == model_name
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_loan_date_of_approval_index'),
+    ]
+
+    operations = [
+        *[
+            migrations.AddField(
+                model_name=model_name,
+                name=f'{field}_paise',
+                field=models.BigIntegerField(null=True),
+            )
+            for model_name, field in MONEY_FIELDS
+        ],
+        # The rupee columns become nullable first so that unapplying can re-add them before copying back
+        *[
+            migrations.AlterField(
+                model_name=model_name,
+                name=field,
+                field=models.DecimalField(decimal_places=2, default=0.0, max_digits=10, null=True)
+                if field == 'current_debt' else models.DecimalField(decimal_places=2, max_digits=10, null=True),
+            )
+            for model_name, field in MONEY_FIELDS
+        ],
+        migrations.RunPython(copy_rupees_to_paise, copy_paise_to_rupees),
+        *[
+            migrations.RemoveField(
+                model_name=model_name,
+                name=field,
+            )
+            for model_name, field in MONEY_FIELDS
+        ],
+        *[
+            migrations.RenameField(
+                model_name=model_name,
+                old_name=f'{field}_paise',
+                new_name=field,
+            )
+            for model_name, field in MONEY_FIELDS
+        ],
+        migrations.AlterField(
+            model_name='customer',
+            name='monthly_salary',
+            field=core.money.PaiseField(),
+        ),
+        migrations.AlterField(
+            model_name='customer',
+            name='approved_limit',
+            field=core.money.PaiseField(),
+        ),
+        migrations.AlterField(
+            model_name='customer',
+            name='current_debt',
+            field=core.money.PaiseField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='loan',
+            name='loan_amount',
+            field=core.money.PaiseField(),
+        ),
+        migrations.AlterField(
+            model_name='loan',
+            name='monthly_installment',
+            field=core.money.PaiseField(),
+        ),
+    ]
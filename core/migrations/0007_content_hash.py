@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_money_in_paise'),
+    ]
+
+    # Existing rows start with an empty hash, which never matches an incoming
+    # row, so the first incremental ingestion writes each of them once
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='loan',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:19
+
+import core.money
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='archived_loan_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='ArchivedLoan',
+            fields=[
+                ('loan_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('loan_amount', core.money.PaiseField()),
+                ('tenure', models.PositiveIntegerField()),
+                ('interest_rate', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('monthly_installment', core.money.PaiseField()),
+                ('emis_paid_on_time', models.PositiveIntegerField()),
+                ('date_of_approval', models.DateField(blank=True, null=True)),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_loans', to='core.customer')),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_outbox_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='registered',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddConstraint(
+            model_name='customer',
+            constraint=models.UniqueConstraint(condition=models.Q(('registered', True)), fields=('phone_normalized',), name='unique_registered_phone'),
+        ),
+    ]
@@ -1,26 +1,255 @@
 # core/models.py
-from django.db import models
+import hashlib
+import re
+from decimal import Decimal, ROUND_HALF_EVEN
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from .money import PaiseField
 
-class Customer(models.Model):
+def normalize_phone_number(phone_number):
+    """
+    Reduces a phone number to its digits and drops an Indian country code or
+    trunk prefix, so '+91 98765-43210', '098765 43210' and '9876543210' match.
+    """
+    digits = re.sub(r'\D', '', str(phone_number))
+    if len(digits) == 12 and digits.startswith('91'):
+        return digits[2:]
+    if len(digits) == 11 and digits.startswith('0'):
+        return digits[1:]
+    return digits
+
+def canonical_field_values(instance, names):
+    """
+    Values of the named fields in a form that does not depend on how they were
+    assigned: foreign keys as ids, money as integer paise and other decimals
+    as integers in units of their last decimal place (basis points for rates).
+    """
+    values = []
+    for name in names:
+        field = instance._meta.get_field(name)
+        value = field.get_prep_value(field.to_python(getattr(instance, field.attname)))
+        if isinstance(value, Decimal):
+            value = int(value.scaleb(field.decimal_places).to_integral_value(rounding=ROUND_HALF_EVEN))
+        values.append(value)
+    return tuple(values)
+
+def compute_content_hash(values):
+    """
+    Digest of a row's ingested values. Incremental ingestion compares it with
+    the stored hash to skip rows that have not changed.
+    """
+    return hashlib.blake2b('\x1f'.join(map(str, values)).encode(), digest_size=16).hexdigest()
+
+class ContentHashMixin:
+    """
+    Keeps `content_hash` in step with the fields in CONTENT_HASH_FIELDS on save().
+    Writes that bypass save(), such as bulk_create() and update(), must set it themselves.
+    """
+    CONTENT_HASH_FIELDS = ()
+
+    def content_values(self):
+        return canonical_field_values(self, self.CONTENT_HASH_FIELDS)
+
+    def compute_content_hash(self):
+        return compute_content_hash(self.content_values())
+
+    def _add_derived_update_fields(self, kwargs, derived):
+        # Fields computed in save() are written whenever one of their sources is
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            return
+        update_fields = {self._meta.get_field(name).name for name in update_fields}
+        for field, sources in derived.items():
+            if update_fields & set(sources):
+                update_fields.add(field)
+        kwargs['update_fields'] = update_fields
+
+class ChangeEventMixin:
+    """
+    Records an OutboxEvent in the same transaction as every save() and delete(),
+    so an event exists exactly when its change is committed. Writes that bypass
+    them, such as bulk_create(), bulk_update() and queryset deletes, record
+    their events with OutboxEvent.objects.record_many().
+    """
+    EVENT_FIELDS = ()
+
+    def event_payload(self):
+        return {
+            self._meta.get_field(name).attname: value
+            for name, value in zip(self.EVENT_FIELDS, canonical_field_values(self, self.EVENT_FIELDS))
+        }
+
+    def save(self, *args, **kwargs):
+        event_type = OutboxEvent.CREATED if self._state.adding else OutboxEvent.UPDATED
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            OutboxEvent.objects.record(self, event_type)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            OutboxEvent.objects.record(self, OutboxEvent.DELETED)
+            return super().delete(*args, **kwargs)
+
+class Customer(ContentHashMixin, ChangeEventMixin, models.Model):
     customer_id = models.AutoField(primary_key=True)
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
     age = models.PositiveIntegerField()
     phone_number = models.CharField(max_length=20)
-    monthly_salary = models.DecimalField(max_digits=10, decimal_places=2)
-    approved_limit = models.DecimalField(max_digits=10, decimal_places=2)
-    current_debt = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    phone_normalized = models.CharField(max_length=20, db_index=True, blank=True, editable=False)
+    monthly_salary = PaiseField()
+    approved_limit = PaiseField()
+    current_debt = PaiseField(default=0)
+    content_hash = models.CharField(max_length=32, blank=True, editable=False)
+    # Closed loans moved to ArchivedLoan; each counts as taken and paid on time
+    archived_loan_count = models.PositiveIntegerField(default=0, editable=False)
+    # Set for customers created by the registration APIs, whose phone numbers must be unique
+    registered = models.BooleanField(default=False, editable=False)
+
+    # Only the columns ingestion writes; current_debt is maintained by the app
+    CONTENT_HASH_FIELDS = (
+        'first_name', 'last_name', 'age', 'phone_number',
+        'monthly_salary', 'approved_limit',
+    )
+    EVENT_FIELDS = (*CONTENT_HASH_FIELDS, 'current_debt')
+
+    class Meta:
+        constraints = [
+            # Ingested rows may share numbers, so only registrations are constrained
+            models.UniqueConstraint(
+                fields=['phone_normalized'],
+                condition=models.Q(registered=True),
+                name='unique_registered_phone',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
-class Loan(models.Model):
+    def save(self, *args, **kwargs):
+        self.phone_normalized = normalize_phone_number(self.phone_number)
+        self.content_hash = self.compute_content_hash()
+        self._add_derived_update_fields(kwargs, {
+            'phone_normalized': ('phone_number',),
+            'content_hash': self.CONTENT_HASH_FIELDS,
+        })
+        super().save(*args, **kwargs)
+
+class Loan(ContentHashMixin, ChangeEventMixin, models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='loans')
     loan_id = models.AutoField(primary_key=True)
-    loan_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    loan_amount = PaiseField()
     tenure = models.PositiveIntegerField()
     interest_rate = models.DecimalField(max_digits=5, decimal_places=2)
-    monthly_installment = models.DecimalField(max_digits=10, decimal_places=2)
+    monthly_installment = PaiseField()
     emis_paid_on_time = models.PositiveIntegerField(default=0)
+    date_of_approval = models.DateField(null=True, blank=True, db_index=True)
+    end_date = models.DateField(null=True, blank=True)
+    content_hash = models.CharField(max_length=32, blank=True, editable=False)
+
+    CONTENT_HASH_FIELDS = (
+        'customer', 'loan_amount', 'tenure', 'interest_rate', 'monthly_installment',
+        'emis_paid_on_time', 'date_of_approval', 'end_date',
+    )
+    EVENT_FIELDS = CONTENT_HASH_FIELDS
+
+    def save(self, *args, **kwargs):
+        self.content_hash = self.compute_content_hash()
+        self._add_derived_update_fields(kwargs, {'content_hash': self.CONTENT_HASH_FIELDS})
+        super().save(*args, **kwargs)
+
+class ArchivedLoan(models.Model):
+    """
+    Cold copy of a fully repaid loan moved out of Loan by the archival job. The
+    customer's archived_loan_count already includes it, so eligibility checks
+    never read this table.
+    """
+    loan_id = models.IntegerField(primary_key=True)
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='archived_loans')
+    loan_amount = PaiseField()
+    tenure = models.PositiveIntegerField()
+    interest_rate = models.DecimalField(max_digits=5, decimal_places=2)
+    monthly_installment = PaiseField()
+    emis_paid_on_time = models.PositiveIntegerField()
     date_of_approval = models.DateField(null=True, blank=True)
-    end_date = models.DateField(null=True, blank=True)
\ No newline at end of file
+    end_date = models.DateField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+class OutboxEventManager(models.Manager):
+    def _build(self, instance, event_type):
+        return self.model(
+            aggregate_type=instance._meta.model_name,
+            aggregate_id=instance.pk,
+            event_type=event_type,
+            payload=instance.event_payload(),
+        )
+
+    def record(self, instance, event_type):
+        event = self._build(instance, event_type)
+        event.save()
+        return event
+
+    def record_many(self, instances, event_type):
+        return self.bulk_create([self._build(instance, event_type) for instance in instances])
+
+class OutboxEvent(models.Model):
+    """
+    Change to a Customer or Loan, written in the same transaction as the change.
+    The relay task publishes events to Redis streams in id order and deletes them.
+    """
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ARCHIVED = 'archived'
+
+    aggregate_type = models.CharField(max_length=20)
+    aggregate_id = models.BigIntegerField()
+    event_type = models.CharField(max_length=20)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = OutboxEventManager()
+
+    def __str__(self):
+        return f"{self.aggregate_type} {self.aggregate_id} {self.event_type}"
+
+class CreditPolicy(models.Model):
+    """
+    Credit score weights used by the eligibility check. Only the active policy is
+    used; saving a policy or one of its slabs makes running workers reload it.
+    """
+    name = models.CharField(max_length=100)
+    is_active = models.BooleanField(default=False)
+    paid_on_time_weight = models.IntegerField(default=5, help_text='Added per closed loan paid on time')
+    loans_taken_weight = models.IntegerField(default=-5, help_text='Added per loan taken')
+    current_year_weight = models.IntegerField(default=3, help_text='Added per loan approved in the current year')
+    volume_ratio_weight = models.IntegerField(default=10, help_text='Multiplied by active loan volume / approved limit')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'credit policies'
+
+    def __str__(self):
+        return self.name
+
+class CreditPolicySlab(models.Model):
+    """
+    Applies to credit scores above `min_credit_score`, up to the next slab's bound.
+    Scores at or below the lowest bound are not approved.
+    """
+    policy = models.ForeignKey(CreditPolicy, on_delete=models.CASCADE, related_name='slabs')
+    min_credit_score = models.DecimalField(
+        'credit score above', max_digits=5, decimal_places=2,
+        help_text='Applies to scores strictly above this value'
+    )
+    approve = models.BooleanField(default=True)
+    min_interest_rate = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        ordering = ['min_credit_score']
+        constraints = [
+            models.UniqueConstraint(fields=['policy', 'min_credit_score'], name='unique_policy_slab_bound'),
+        ]
+
+    def __str__(self):
+        return f"{self.policy} > {self.min_credit_score}"
@@ -0,0 +1,142 @@
+# core/money.py
+from decimal import Decimal, ROUND_HALF_EVEN
+from functools import lru_cache
+from django import forms
+from django.core import exceptions, validators
+from django.db import connection, models
+from django.utils.functional import cached_property
+
+PAISE_PER_RUPEE = 100
+
+# Annual percentage rates are handled in basis points (10.50% -> 1050). A monthly
+# rate of r basis points is r / MONTHLY_RATE_DENOMINATOR (12 months * 100% * 100).
+MONTHLY_RATE_DENOMINATOR = 120000
+
+# Fixed-point scale for the compound growth factor in the EMI formula
+GROWTH_SCALE = 10 ** 24
+
+def to_paise(amount):
+    """
+    Converts a rupee amount (Decimal, int, float or str) to integer paise,
+    rounding half to even.
+    """
+    if not isinstance(amount, Decimal):
+        amount = Decimal(str(amount))
+    return int((amount * PAISE_PER_RUPEE).to_integral_value(rounding=ROUND_HALF_EVEN))
+
+def from_paise(paise):
+    """
+    Converts integer paise to a Decimal rupee amount with two decimal places.
+    """
+    return Decimal(int(paise)).scaleb(-2)
+
+def to_basis_points(rate):
+    """
+    Converts an annual percentage rate to integer basis points, rounding half to even.
+    """
+    if not isinstance(rate, Decimal):
+        rate = Decimal(str(rate))
+    return int((rate * 100).to_integral_value(rounding=ROUND_HALF_EVEN))
+
+def divide_half_even(numerator, denominator):
+    """
+    Integer division of non-negative integers rounded half to even.
+    """
+    quotient, remainder = divmod(numerator, denominator)
+    if 2 * remainder > denominator or (2 * remainder == denominator and quotient % 2):
+        quotient += 1
+    return quotient
+
+@lru_cache(maxsize=4096)
+def compound_growth(rate_bp, tenure):
+    """
+    (1 + monthly rate) ** tenure as a fixed-point integer scaled by GROWTH_SCALE,
+    computed by repeated squaring. Each step truncates, so the relative error
+    stays around tenure / GROWTH_SCALE. Requests use few distinct rate and
+    tenure pairs, so results are cached.
+    """
+    base = (MONTHLY_RATE_DENOMINATOR + rate_bp) * GROWTH_SCALE // MONTHLY_RATE_DENOMINATOR
+    growth = GROWTH_SCALE
+    while tenure:
+        if tenure & 1:
+            growth = growth * base // GROWTH_SCALE
+        base = base * base // GROWTH_SCALE
+        tenure >>= 1
+    return growth
+
+def installment_factor(rate_bp, tenure):
+    """
+    (numerator, denominator) such that the EMI for a principal P in paise is
+    P * numerator / denominator, for an annual rate in basis points and a
+    tenure in months. Lets a grid of principals share one factor per rate and tenure.
+    """
+    if tenure < 1:
+        raise ValueError("Tenure must be at least one month.")
+    if rate_bp <= 0:
+        return 1, tenure
+    growth = compound_growth(rate_bp, tenure)
+    return rate_bp * growth, MONTHLY_RATE_DENOMINATOR * (growth - GROWTH_SCALE)
+
+def monthly_installment_paise(principal_paise, rate_bp, tenure):
+    """
+    EMI in paise for a principal in paise, an annual rate in basis points and a
+    tenure in months: P * r * (1 + r)^n / ((1 + r)^n - 1), or P / n at a zero
+    rate. The result is rounded half to even to the paisa, like round(emi, 2)
+    on the previous Decimal calculation. The two only differ when the exact
+    EMI ends in half a paisa, where the Decimal result depended on the
+    rounding error of its 28-digit power.
+    """
+    numerator, denominator = installment_factor(rate_bp, tenure)
+    return divide_half_even(principal_paise * numerator, denominator)
+
+class PaiseField(models.BigIntegerField):
+    """
+    Money column stored as integer paise. Python code keeps working with
+    Decimal rupee amounts: values are converted on the way to and from the
+    database, so only raw SQL and F() arithmetic see paise.
+    """
+    description = "Rupee amount stored as integer paise"
+    # Read by serializers and forms that treat the field as a decimal amount
+    max_digits = 19
+    decimal_places = 2
+
+    @cached_property
+    def validators(self):
+        # The backend's BIGINT range is in paise, while values are validated in rupees
+        min_value, max_value = connection.ops.integer_field_range(self.get_internal_type())
+        range_validators = []
+        if min_value is not None:
+            range_validators.append(validators.MinValueValidator(from_paise(min_value)))
+        if max_value is not None:
+            range_validators.append(validators.MaxValueValidator(from_paise(max_value)))
+        return [*self.default_validators, *self._validators, *range_validators]
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return from_paise(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, Decimal):
+            return value
+        try:
+            return from_paise(to_paise(value))
+        except (ArithmeticError, ValueError, TypeError):
+            raise exceptions.ValidationError(
+                self.error_messages['invalid'],
+                code='invalid',
+                params={'value': value},
+            )
+
+    def get_prep_value(self, value):
+        if value is None or hasattr(value, 'resolve_expression'):
+            return value
+        return to_paise(value)
+
+    def formfield(self, **kwargs):
+        return models.Field.formfield(self, **{
+            'form_class': forms.DecimalField,
+            'max_digits': self.max_digits,
+            'decimal_places': self.decimal_places,
+            **kwargs,
+        })
@@ -0,0 +1,86 @@
+# core/outbox.py
+import json
+import redis
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from .models import OutboxEvent
+
+# Events published per transaction by the relay
+OUTBOX_RELAY_BATCH_SIZE = 500
+
+# Key of the PostgreSQL advisory lock that lets one relay publish at a time
+OUTBOX_RELAY_LOCK_ID = 0x6f7574626f78
+
+_client = None
+
+def get_redis():
+    global _client
+
+    if _client is None:
+        _client = redis.Redis.from_url(settings.OUTBOX_REDIS_URL)
+    return _client
+
+def stream_name(aggregate_type):
+    """
+    Redis stream an aggregate type's events are published to, e.g. 'core:events:loan'.
+    """
+    return f"{settings.OUTBOX_STREAM_PREFIX}:{aggregate_type}"
+
+def event_message(event):
+    """
+    Flat field map of a stream entry. Consumers should skip event ids they have
+    already seen, because a relay that fails after publishing sends a batch again.
+    """
+    return {
+        "event_id": event.id,
+        "aggregate_id": event.aggregate_id,
+        "event_type": event.event_type,
+        "payload": json.dumps(event.payload, cls=DjangoJSONEncoder, separators=(',', ':')),
+        "created_at": event.created_at.isoformat(),
+    }
+
+def acquire_relay_lock():
+    """
+    Takes the relay's advisory lock for the current transaction. Returns False
+    if another relay holds it. On databases without advisory locks, such as
+    SQLite in tests, writers are serialized anyway and this returns True.
+    """
+    if connection.vendor != 'postgresql':
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [OUTBOX_RELAY_LOCK_ID])
+        return cursor.fetchone()[0]
+
+def relay_outbox_events(batch_size=OUTBOX_RELAY_BATCH_SIZE):
+    """
+    Publishes pending events to their Redis streams in id order and deletes
+    them, one batch per transaction. Each batch holds an advisory lock, so a
+    relay started while another is draining returns instead of publishing
+    later events first.
+    Returns the number of events relayed.
+    """
+    client = get_redis()
+    relayed = 0
+    while True:
+        with transaction.atomic():
+            if not acquire_relay_lock():
+                return relayed
+            events = list(OutboxEvent.objects.select_for_update().order_by('id')[:batch_size])
+            if not events:
+                return relayed
+
+            pipeline = client.pipeline(transaction=False)
+            for event in events:
+                pipeline.xadd(
+                    stream_name(event.aggregate_type),
+                    event_message(event),
+                    maxlen=settings.OUTBOX_STREAM_MAXLEN,
+                    approximate=True,
+                )
+            pipeline.execute()
+
+            OutboxEvent.objects.filter(id__in=[event.id for event in events]).delete()
+        relayed += len(events)
+        if len(events) < batch_size:
+            return relayed
@@ -1,13 +1,25 @@
 # core/serializers.py
+from django.conf import settings
 from rest_framework import serializers
-from .models import Customer, Loan
+from .models import ArchivedLoan, Customer, Loan
+from .money import PaiseField
 
-class CustomerSerializer(serializers.ModelSerializer):
+class MoneyModelSerializer(serializers.ModelSerializer):
+    """
+    Maps PaiseField columns to DecimalField so that money stored as integer
+    paise is still read and written as rupee amounts like "500000.00".
+    """
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        PaiseField: serializers.DecimalField,
+    }
+
+class CustomerSerializer(MoneyModelSerializer):
     class Meta:
         model = Customer
         fields = '__all__'
 
-class LoanSerializer(serializers.ModelSerializer):
+class LoanSerializer(MoneyModelSerializer):
     class Meta:
         model = Loan
         fields = '__all__'
@@ -18,25 +30,74 @@ class RegisterCustomerSerializer(serializers.Serializer):
     age = serializers.IntegerField()
     monthly_income = serializers.DecimalField(max_digits=10, decimal_places=2)
     phone_number = serializers.CharField(max_length=20)
+
+class RegisterCustomerBatchSerializer(serializers.ListSerializer):
+    """
+    Validates a list of registrations item by item. Invalid items are kept in
+    place as ValidationError instances so that one bad row does not reject
+    the whole batch.
+    """
+    child = RegisterCustomerSerializer()
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('allow_empty', False)
+        kwargs.setdefault('max_length', 10000)
+        super().__init__(*args, **kwargs)
+
+    def run_child_validation(self, data):
+        try:
+            return self.child.run_validation(data)
+        except serializers.ValidationError as exc:
+            return exc
     
 class CheckEligibilitySerializer(serializers.Serializer):
     customer_id = serializers.IntegerField()
     loan_amount = serializers.DecimalField(max_digits=10, decimal_places=2)
     interest_rate = serializers.DecimalField(max_digits=5, decimal_places=2)
-    tenure = serializers.IntegerField()
+    tenure = serializers.IntegerField(min_value=1)
+
+class EligibilityGridSerializer(serializers.Serializer):
+    customer_id = serializers.IntegerField()
+    loan_amounts = serializers.ListField(
+        child=serializers.DecimalField(max_digits=10, decimal_places=2), allow_empty=False, max_length=100
+    )
+    interest_rates = serializers.ListField(
+        child=serializers.DecimalField(max_digits=5, decimal_places=2), allow_empty=False, max_length=100
+    )
+    tenures = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=100
+    )
+
+    def validate(self, data):
+        cells = len(data['loan_amounts']) * len(data['interest_rates']) * len(data['tenures'])
+        if cells > settings.ELIGIBILITY_GRID_MAX_CELLS:
+            raise serializers.ValidationError(
+                f"The grid has {cells} combinations; at most {settings.ELIGIBILITY_GRID_MAX_CELLS} are allowed."
+            )
+        return data
 
 class CreateLoanSerializer(serializers.Serializer):
     customer_id = serializers.IntegerField()
     loan_amount = serializers.DecimalField(max_digits=10, decimal_places=2)
     interest_rate = serializers.DecimalField(max_digits=5, decimal_places=2)
-    tenure = serializers.IntegerField()
+    tenure = serializers.IntegerField(min_value=1)
+
+class ExportFilterSerializer(serializers.Serializer):
+    approved_from = serializers.DateField(required=False)
+    approved_to = serializers.DateField(required=False)
+
+class CustomerLoansFilterSerializer(serializers.Serializer):
+    include_archived = serializers.BooleanField(required=False, default=False)
+
+class CustomerLookupSerializer(serializers.Serializer):
+    phone = serializers.CharField(max_length=20)
 
 class CustomerLoanSerializer(serializers.ModelSerializer):
     class Meta:
         model = Customer
         fields = ['customer_id', 'first_name', 'last_name', 'phone_number', 'age']
 
-class LoanDetailSerializer(serializers.ModelSerializer):
+class LoanDetailSerializer(MoneyModelSerializer):
     customer = CustomerLoanSerializer(read_only=True)
     loan_approved = serializers.BooleanField(source='loan_id', read_only=True)
 
@@ -44,7 +105,7 @@ class LoanDetailSerializer(serializers.ModelSerializer):
         model = Loan
         fields = ['loan_id', 'customer', 'loan_amount', 'interest_rate', 'monthly_installment', 'tenure', 'loan_approved']
 
-class CustomerLoansSerializer(serializers.ModelSerializer):
+class CustomerLoansSerializer(MoneyModelSerializer):
     repayments_left = serializers.SerializerMethodField()
 
     class Meta:
@@ -55,4 +116,12 @@ class CustomerLoansSerializer(serializers.ModelSerializer):
         # Calculate remaining EMIs for active loans
         if obj.tenure is not None and obj.emis_paid_on_time is not None:
             return obj.tenure - obj.emis_paid_on_time
-        return 0
\ No newline at end of file
+        return 0
+
+class ArchivedLoanDetailSerializer(LoanDetailSerializer):
+    class Meta(LoanDetailSerializer.Meta):
+        model = ArchivedLoan
+
+class ArchivedCustomerLoansSerializer(CustomerLoansSerializer):
+    class Meta(CustomerLoansSerializer.Meta):
+        model = ArchivedLoan
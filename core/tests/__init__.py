@@ -1 +1,9 @@
-# This file makes 'tests' a Python package
\ No newline at end of file
+# This file makes 'tests' a Python package
+
+# Tests must not touch the Redis cache of a running stack, so the test classes use this instead
+LOCAL_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'core-tests',
+    }
+}
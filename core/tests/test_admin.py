@@ -0,0 +1,58 @@
+# core/tests/test_admin.py
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from decimal import Decimal
+from datetime import date
+from core.models import Customer, Loan
+
+class LargeTableAdminTest(TestCase):
+
+    def setUp(self):
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+        self.customer = Customer.objects.create(
+            first_name="Admin", last_name="User", age=30, phone_number="+91 98765 43210",
+            monthly_salary=Decimal('50000'), approved_limit=Decimal('1800000')
+        )
+
+    def create_loans(self, count):
+        for _ in range(count):
+            customer = Customer.objects.create(
+                first_name="Loan", last_name="Holder", age=30, phone_number="9000000000",
+                monthly_salary=Decimal('50000'), approved_limit=Decimal('1800000')
+            )
+            Loan.objects.create(
+                customer=customer, loan_amount=Decimal('100000'), tenure=12,
+                interest_rate=Decimal('12.00'), monthly_installment=Decimal('8885'),
+                date_of_approval=date(2024, 1, 1)
+            )
+
+    def test_loan_changelist_query_count_is_independent_of_rows(self):
+        """
+        Test that the loan changelist loads customers with a join instead of one query per row.
+        """
+        self.create_loans(2)
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get('/admin/core/loan/')
+        self.assertEqual(response.status_code, 200)
+
+        self.create_loans(10)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get('/admin/core/loan/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(few), len(many))
+
+    def test_customer_search_matches_exact_phone_or_id(self):
+        """
+        Test that customer search matches a normalized phone number or an exact customer ID.
+        """
+        response = self.client.get('/admin/core/customer/', {'q': '09876543210'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.customer])
+
+        response = self.client.get('/admin/core/customer/', {'q': str(self.customer.customer_id)})
+        self.assertEqual(list(response.context['cl'].result_list), [self.customer])
+
+        response = self.client.get('/admin/core/customer/', {'q': '98765'})
+        self.assertEqual(list(response.context['cl'].result_list), [])
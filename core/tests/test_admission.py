@@ -0,0 +1,37 @@
+# core/tests/test_admission.py
+import fakeredis
+from django.test import SimpleTestCase, override_settings
+from unittest import mock
+from core import admission
+
+@override_settings(ASYNC_LOAN_QUEUE='loans', ASYNC_LOAN_MAX_QUEUE_DEPTH=5, ASYNC_LOAN_ADMISSION_RATE=1, ASYNC_LOAN_ADMISSION_BURST=3)
+class AdmissionControlTest(SimpleTestCase):
+
+    def setUp(self):
+        # fakeredis runs the token bucket Lua script with lupa
+        self.redis = fakeredis.FakeRedis()
+        patcher = mock.patch('core.admission.redis.Redis.from_url', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        admission._client = None
+        self.addCleanup(setattr, admission, '_client', None)
+
+    def test_token_bucket_admits_a_burst_then_rejects(self):
+        """
+        Test that the Lua token bucket admits up to the burst size and then asks the client to retry.
+        """
+        results = [admission.admit_loan_request() for _ in range(4)]
+        self.assertEqual(results[:3], [(True, 0)] * 3)
+        self.assertEqual(results[3], (False, 1))
+        self.assertLess(float(self.redis.hget(admission.TOKEN_BUCKET_KEY, 'tokens')), 1)
+
+    def test_deep_queue_sheds_requests(self):
+        """
+        Test that requests are shed without taking a token while the queue is above the threshold.
+        """
+        self.redis.rpush('loans', *range(7))
+        self.assertEqual(admission.admit_loan_request(), (False, 3))
+        self.assertFalse(self.redis.exists(admission.TOKEN_BUCKET_KEY))
+
+        self.redis.ltrim('loans', 0, 3)
+        self.assertEqual(admission.admit_loan_request(), (True, 0))
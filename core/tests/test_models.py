@@ -0,0 +1,129 @@
+# core/tests/test_models.py
+from django.test import SimpleTestCase, TestCase, override_settings
+from decimal import Decimal
+from fractions import Fraction
+from core import credit
+from core.credit import CompiledCreditPolicy, DEFAULT_SLABS, DEFAULT_WEIGHTS
+from core.models import Customer
+from core.money import from_paise, monthly_installment_paise, to_basis_points, to_paise
+
+class CompiledCreditPolicyTest(SimpleTestCase):
+
+    def setUp(self):
+        self.policy = CompiledCreditPolicy(DEFAULT_WEIGHTS, DEFAULT_SLABS)
+
+    def test_slab_bounds_are_exclusive_below(self):
+        """
+        Test that each slab covers scores above its bound up to the next bound.
+        """
+        cases = [
+            (Decimal('10'), False, Decimal('8.00')),
+            (Decimal('11'), True, Decimal('16.00')),
+            (Decimal('30'), True, Decimal('16.00')),
+            (Decimal('31'), True, Decimal('12.00')),
+            (Decimal('50'), True, Decimal('12.00')),
+            (Decimal('51'), True, Decimal('8.00')),
+        ]
+        for credit_score, approval, rate in cases:
+            with self.subTest(credit_score=credit_score):
+                self.assertEqual(self.policy.evaluate(credit_score, Decimal('8.00'))[:2], (approval, rate))
+        self.assertEqual(self.policy.slab_label(Decimal('50')), '30_to_50')
+        self.assertEqual(self.policy.slab_label(Decimal('5')), '10_or_below')
+
+    def test_score_many_matches_score(self):
+        """
+        Test that batch scoring gives the same scores as scoring one customer at a time.
+        """
+        rows = [
+            {"approved_limit": Decimal('500000'), "past_loans_paid_on_time": 2, "total_loans_taken": 4,
+             "loans_this_year": 1, "total_active_loan_amount": Decimal('250000')},
+            {"approved_limit": Decimal('100000'), "past_loans_paid_on_time": 0, "total_loans_taken": 1,
+             "loans_this_year": 0, "total_active_loan_amount": Decimal('200000')},
+        ]
+        self.assertEqual(self.policy.score_many(rows), [Decimal('98'), Decimal('0')])
+        self.assertEqual(self.policy.score(**rows[0]), Decimal('98'))
+
+    def test_score_is_the_same_in_rupees_and_paise(self):
+        """
+        Test that the score only depends on the ratio of the amounts, not their unit.
+        """
+        rupees = (Decimal('300000.50'), 1, 3, 2, Decimal('123456.78'))
+        paise = (to_paise(rupees[0]), 1, 3, 2, to_paise(rupees[4]))
+        self.assertEqual(self.policy.score(*rupees), self.policy.score(*paise))
+
+# A Redis cache on a port nothing listens on
+UNREACHABLE_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:1/1',
+    }
+}
+
+@override_settings(CACHES=UNREACHABLE_CACHES)
+class CreditPolicyCacheOutageTest(TestCase):
+
+    def setUp(self):
+        credit._compiled_policy = None
+        self.addCleanup(setattr, credit, '_compiled_policy', None)
+
+    def test_policy_is_served_without_the_cache(self):
+        """
+        Test that an unreachable cache neither breaks policy lookups nor policy changes.
+        """
+        policy = credit.get_credit_policy()
+        self.assertEqual(policy.evaluate(Decimal('60'), Decimal('8.00'))[:2], (True, Decimal('8.00')))
+        self.assertIs(credit._compiled_version, credit.VERSION_UNAVAILABLE)
+        credit.invalidate_credit_policy()
+        self.assertIsInstance(credit.get_credit_policy(), CompiledCreditPolicy)
+
+class MoneyTest(TestCase):
+
+    def decimal_installment(self, loan_amount, interest_rate, tenure):
+        # The EMI formula as it was computed with Decimal before amounts moved to paise
+        monthly_rate = (interest_rate / Decimal('12.00')) / Decimal('100.00')
+        if monthly_rate > 0:
+            monthly_installment = (loan_amount * monthly_rate) / (Decimal('1') - (Decimal('1') + monthly_rate)**(-tenure))
+        else:
+            monthly_installment = loan_amount / Decimal(tenure)
+        return round(monthly_installment, 2)
+
+    def test_installment_matches_decimal_formula(self):
+        """
+        Test that the integer EMI equals the rounded Decimal EMI, except at an exact
+        half paisa where it rounds to even instead of following Decimal's rounding error.
+        """
+        for loan_amount in (Decimal('1000'), Decimal('99999.99'), Decimal('500000'), Decimal('12345678.90')):
+            for interest_rate in (Decimal('0'), Decimal('0.01'), Decimal('8.00'), Decimal('10.50'), Decimal('16.00'), Decimal('36.99')):
+                for tenure in (1, 6, 12, 24, 120, 360):
+                    with self.subTest(loan_amount=loan_amount, interest_rate=interest_rate, tenure=tenure):
+                        emi = monthly_installment_paise(to_paise(loan_amount), to_basis_points(interest_rate), tenure)
+                        exact = self.exact_installment_paise(loan_amount, interest_rate, tenure)
+                        if exact.denominator == 2:
+                            self.assertEqual(emi, round(exact))
+                        else:
+                            self.assertEqual(from_paise(emi), self.decimal_installment(loan_amount, interest_rate, tenure))
+
+    def exact_installment_paise(self, loan_amount, interest_rate, tenure):
+        monthly_rate = Fraction(interest_rate) / 1200
+        if monthly_rate == 0:
+            return Fraction(to_paise(loan_amount), tenure)
+        growth = (1 + monthly_rate) ** tenure
+        return to_paise(loan_amount) * monthly_rate * growth / (growth - 1)
+
+    def test_paise_field_round_trip(self):
+        """
+        Test that money is stored as integer paise and read back as Decimal rupees.
+        """
+        customer = Customer.objects.create(
+            first_name="Money", last_name="User", age=30, phone_number="9123456789",
+            monthly_salary=Decimal('12345.67'), approved_limit=500000
+        )
+        customer.refresh_from_db()
+        self.assertEqual(customer.monthly_salary, Decimal('12345.67'))
+        self.assertEqual(customer.approved_limit, Decimal('500000.00'))
+        self.assertEqual(customer.current_debt, Decimal('0.00'))
+        self.assertEqual(Customer.objects.filter(monthly_salary__gt=Decimal('12345.66')).count(), 1)
+        self.assertEqual(
+            Customer.objects.extra(select={'raw': 'monthly_salary'}).values_list('raw', flat=True).get(),
+            1234567
+        )
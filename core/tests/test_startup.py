@@ -0,0 +1,67 @@
+# core/tests/test_startup.py
+from django.conf import settings
+from django.test import SimpleTestCase
+import json
+import subprocess
+import sys
+import tempfile
+
+# Modules that are only needed by ingestion and exports
+HEAVY_MODULES = ('pandas', 'numpy', 'pyarrow', 'openpyxl')
+
+# Imports a web process (URLconf) and a Celery worker (task autodiscovery) perform at startup
+STARTUP_SCRIPT = """
+import django
+django.setup()
+import credit_system.urls
+from credit_system.celery import app
+app.loader.import_default_modules()
+import sys
+print('\\n'.join(sorted(sys.modules)))
+"""
+
+def startup_import_times():
+    """
+    Runs the startup imports in a fresh interpreter with `-X importtime`.
+    Returns ({module: cumulative microseconds}, names of all loaded modules).
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+        cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        times[module.strip()] = int(cumulative)
+    return times, set(result.stdout.split())
+
+class StartupImportTest(SimpleTestCase):
+
+    def test_startup_does_not_import_heavy_modules(self):
+        """
+        Test that web and worker startup defer pandas and the other ingestion-only libraries.
+        """
+        times, modules = startup_import_times()
+        self.assertIn('core.tasks', modules)
+        heavy = sorted(module for module in modules | set(times) if module.split('.')[0] in HEAVY_MODULES)
+        self.assertEqual(heavy, [])
+
+class OpenAPIDocsTest(SimpleTestCase):
+
+    def test_docs_pages_load_the_prebuilt_schema(self):
+        """
+        Test that the Swagger and ReDoc pages point at the schema file, which is served as generated.
+        """
+        for url in ('/swagger/', '/redoc/'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, '/swagger.json')
+
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as schema_file:
+            json.dump({"swagger": "2.0", "paths": {"/prebuilt/": {}}}, schema_file)
+            schema_file.flush()
+            with self.settings(OPENAPI_SCHEMA_PATH=schema_file.name):
+                response = self.client.get('/swagger.json')
+                self.assertEqual(json.loads(b''.join(response.streaming_content)), {"swagger": "2.0", "paths": {"/prebuilt/": {}}})
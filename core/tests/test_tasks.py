@@ -0,0 +1,266 @@
+# core/tests/test_tasks.py
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from decimal import Decimal
+from datetime import date
+from core.tests import LOCAL_CACHES
+from core.models import ArchivedLoan, Customer, Loan, OutboxEvent
+from core.loans import calculate_eligibility, create_loan
+from core.tasks import archive_closed_loans, ingest_customer_and_loan_data, relay_outbox_events
+from unittest import mock
+import pandas as pd
+import tempfile
+import os
+
+CUSTOMER_ROWS = {
+    "Customer ID": [1, 2],
+    "First Name": ["Aarav", "Diya"],
+    "Last Name": ["Shah", "Rao"],
+    "Age": [30, 41],
+    "Phone Number": [9876543210, 9123456780],
+    "Monthly Salary": [50000, 120000],
+    "Approved Limit": [1800000, 4400000],
+    "Unused Column": ["x", "y"],
+}
+
+LOAN_ROWS = {
+    "Customer ID": [1, 2],
+    "Loan ID": [101, 102],
+    "Loan Amount": [200000, 500000],
+    "Tenure": [12, 24],
+    "Interest Rate": [10.5, 12.0],
+    "Monthly payment": [17630, 23537],
+    "EMIs paid on Time": [12, 5],
+    "Date of Approval": ["01-01-2022", "15-03-2023"],
+    "End Date": ["01-01-2023", "15-03-2025"],
+}
+
+@override_settings(CACHES=LOCAL_CACHES)
+class IngestionTaskTest(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def ingest(self, extension, write, customer_rows=CUSTOMER_ROWS, loan_rows=LOAN_ROWS, incremental=False):
+        customer_path = os.path.join(self.tmpdir.name, f"customers{extension}")
+        loan_path = os.path.join(self.tmpdir.name, f"loans{extension}")
+        write(pd.DataFrame(customer_rows), customer_path)
+        write(pd.DataFrame(loan_rows), loan_path)
+        return ingest_customer_and_loan_data(customer_path, loan_path, incremental=incremental)
+
+    def assert_ingested(self, result):
+        self.assertEqual(result, "Data ingestion completed successfully.")
+        customer = Customer.objects.get(customer_id=1)
+        self.assertEqual(customer.phone_number, "9876543210")
+        self.assertEqual(customer.approved_limit, Decimal('1800000'))
+        loan = Loan.objects.get(loan_id=102)
+        self.assertEqual(loan.customer_id, 2)
+        self.assertEqual(loan.interest_rate, Decimal('12.00'))
+        self.assertEqual(loan.date_of_approval, date(2023, 3, 15))
+
+    def test_ingest_csv(self):
+        """
+        Test that customers and loans are ingested from CSV files.
+        """
+        self.assert_ingested(self.ingest('.csv', lambda df, path: df.to_csv(path, index=False)))
+
+    def test_ingest_parquet(self):
+        """
+        Test that customers and loans are ingested from Parquet files.
+        """
+        self.assert_ingested(self.ingest('.parquet', lambda df, path: df.to_parquet(path, index=False)))
+
+    def test_ingest_unsupported_format(self):
+        """
+        Test that an unknown file extension is reported instead of ingested.
+        """
+        result = self.ingest('.json', lambda df, path: df.to_json(path))
+        self.assertIn("Unsupported file format", result)
+        self.assertFalse(Customer.objects.exists())
+
+    def test_ingest_incremental_writes_only_changes(self):
+        """
+        Test that incremental ingestion skips unchanged rows and reports the counts.
+        """
+        write_csv = lambda df, path: df.to_csv(path, index=False)
+        result = self.ingest('.csv', write_csv, incremental=True)
+        self.assertEqual(
+            result,
+            "Incremental ingestion completed. Customers: 2 new, 0 updated, 0 unchanged. "
+            "Loans: 2 new, 0 updated, 0 unchanged."
+        )
+        self.assert_ingested("Data ingestion completed successfully.")
+
+        customer_rows = {**CUSTOMER_ROWS, "Customer ID": [1, 2, 3], "First Name": ["Aarav", "Diya", "Kabir"],
+                         "Last Name": ["Shah", "Rao", "Nair"], "Age": [30, 42, 25],
+                         "Phone Number": [9876543210, 9123456780, 9000000001],
+                         "Monthly Salary": [50000, 120000, 30000], "Approved Limit": [1800000, 4400000, 1100000],
+                         "Unused Column": ["x", "y", "z"]}
+        loan_rows = {**LOAN_ROWS, "EMIs paid on Time": [12, 6]}
+        with CaptureQueriesContext(connection) as queries:
+            result = self.ingest('.csv', write_csv, customer_rows, loan_rows, incremental=True)
+        self.assertEqual(
+            result,
+            "Incremental ingestion completed. Customers: 1 new, 1 updated, 1 unchanged. "
+            "Loans: 0 new, 1 updated, 1 unchanged."
+        )
+        self.assertEqual(Customer.objects.get(customer_id=2).age, 42)
+        self.assertEqual(Loan.objects.get(loan_id=102).emis_paid_on_time, 6)
+        # Unchanged rows are not written at all
+        self.assertFalse(any('"customer_id" = 1' in query['sql'] and query['sql'].startswith('UPDATE') for query in queries))
+
+    def test_full_ingestion_keeps_hashes_current(self):
+        """
+        Test that a full ingestion stores hashes an incremental run can match.
+        """
+        write_csv = lambda df, path: df.to_csv(path, index=False)
+        self.ingest('.csv', write_csv)
+        result = self.ingest('.csv', write_csv, incremental=True)
+        self.assertEqual(
+            result,
+            "Incremental ingestion completed. Customers: 0 new, 0 updated, 2 unchanged. "
+            "Loans: 0 new, 0 updated, 2 unchanged."
+        )
+
+    def test_incremental_ingestion_keeps_app_debt(self):
+        """
+        Test that a loan taken through the app neither marks its customer as changed nor loses its debt on re-ingestion.
+        """
+        write_csv = lambda df, path: df.to_csv(path, index=False)
+        self.ingest('.csv', write_csv, incremental=True)
+        response_data, _ = create_loan(1, Decimal('100000'), Decimal('16.00'), 12)
+        self.assertTrue(response_data['loan_approved'])
+
+        result = self.ingest('.csv', write_csv, incremental=True)
+        self.assertIn("Customers: 0 new, 0 updated, 2 unchanged.", result)
+        self.assertEqual(Customer.objects.get(customer_id=1).current_debt, Decimal('100000.00'))
+
+        result = self.ingest('.csv', write_csv, {**CUSTOMER_ROWS, "Age": [31, 41]}, incremental=True)
+        self.assertIn("Customers: 0 new, 1 updated, 1 unchanged.", result)
+        customer = Customer.objects.get(customer_id=1)
+        self.assertEqual(customer.age, 31)
+        self.assertEqual(customer.current_debt, Decimal('100000.00'))
+        event = OutboxEvent.objects.filter(aggregate_type='customer', aggregate_id=1).latest('id')
+        self.assertEqual(event.event_type, OutboxEvent.UPDATED)
+        self.assertEqual(event.payload['age'], 31)
+        self.assertEqual(event.payload['current_debt'], 10000000)
+
+@override_settings(CACHES=LOCAL_CACHES)
+class ArchivalTaskTest(TestCase):
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Old", last_name="Borrower", age=50, phone_number="9988776655",
+            monthly_salary=Decimal('80000'), approved_limit=Decimal('2900000')
+        )
+        self.closed_loan = Loan.objects.create(
+            customer=self.customer, loan_amount=Decimal('100000'), tenure=12, interest_rate=Decimal('12.00'),
+            monthly_installment=Decimal('8884.88'), emis_paid_on_time=12,
+            date_of_approval=date(2020, 1, 10), end_date=date(2021, 1, 10)
+        )
+        self.active_loan = Loan.objects.create(
+            customer=self.customer, loan_amount=Decimal('200000'), tenure=60, interest_rate=Decimal('11.00'),
+            monthly_installment=Decimal('4348.48'), emis_paid_on_time=10,
+            date_of_approval=date(2023, 6, 1), end_date=date(2099, 6, 1)
+        )
+
+    def test_archive_closed_loans_keeps_eligibility(self):
+        """
+        Test that closed loans move to the archive without changing the eligibility result.
+        """
+        before = calculate_eligibility(self.customer, Decimal('300000'), Decimal('9.00'), 24)
+
+        self.assertEqual(archive_closed_loans(), "Archived 1 closed loans.")
+        self.assertFalse(Loan.objects.filter(loan_id=self.closed_loan.loan_id).exists())
+        self.assertTrue(ArchivedLoan.objects.filter(loan_id=self.closed_loan.loan_id).exists())
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.archived_loan_count, 1)
+
+        self.assertEqual(calculate_eligibility(self.customer, Decimal('300000'), Decimal('9.00'), 24), before)
+        self.assertEqual(archive_closed_loans(), "Archived 0 closed loans.")
+
+    def test_archival_during_create_loan_keeps_the_counter(self):
+        """
+        Test that archival committing while create_loan checks eligibility is not overwritten by the debt update.
+        """
+        def archive_during_check(*args):
+            result = calculate_eligibility(*args)
+            archive_closed_loans()
+            return result
+
+        with mock.patch('core.loans.calculate_eligibility', side_effect=archive_during_check):
+            response_data, _ = create_loan(self.customer.customer_id, Decimal('300000'), Decimal('16.00'), 24)
+        self.assertTrue(response_data['loan_approved'])
+
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.archived_loan_count, 1)
+        self.assertEqual(self.customer.current_debt, Decimal('300000.00'))
+        self.assertEqual(self.customer.loans.count(), 2)
+
+    def test_archived_loans_are_still_viewable(self):
+        """
+        Test that archived loans can be listed on request and viewed by ID.
+        """
+        archive_closed_loans()
+        url = f'/api/view-loans/{self.customer.customer_id}/'
+        self.assertEqual([loan['loan_id'] for loan in self.client.get(url).json()], [self.active_loan.loan_id])
+        response = self.client.get(url, {'include_archived': 'true'})
+        self.assertEqual(
+            [loan['loan_id'] for loan in response.json()],
+            [self.active_loan.loan_id, self.closed_loan.loan_id]
+        )
+
+        response = self.client.get(f'/api/view-loan/{self.closed_loan.loan_id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['loan_amount'], '100000.00')
+
+@override_settings(CACHES=LOCAL_CACHES)
+class OutboxRelayTest(TestCase):
+
+    def test_writes_record_events_that_the_relay_publishes(self):
+        """
+        Test that customer and loan writes record outbox events and the relay publishes and removes them.
+        """
+        customer = Customer.objects.create(
+            first_name="Event", last_name="User", age=28, phone_number="9876501234",
+            monthly_salary=Decimal('60000'), approved_limit=Decimal('2200000')
+        )
+        loan = Loan.objects.create(
+            customer=customer, loan_amount=Decimal('100000'), tenure=12, interest_rate=Decimal('12.00'),
+            monthly_installment=Decimal('8884.88'), date_of_approval=date(2024, 1, 1), end_date=date(2025, 1, 1)
+        )
+        customer.current_debt += loan.loan_amount
+        customer.save()
+
+        events = list(OutboxEvent.objects.order_by('id').values_list('aggregate_type', 'aggregate_id', 'event_type'))
+        self.assertEqual(events, [
+            ('customer', customer.customer_id, 'created'),
+            ('loan', loan.loan_id, 'created'),
+            ('customer', customer.customer_id, 'updated'),
+        ])
+        self.assertEqual(OutboxEvent.objects.get(aggregate_type='loan').payload['loan_amount'], 10000000)
+
+        client = mock.MagicMock()
+        with mock.patch('core.outbox.get_redis', return_value=client):
+            self.assertEqual(relay_outbox_events(), "Relayed 3 events.")
+        xadds = client.pipeline.return_value.xadd.call_args_list
+        self.assertEqual([call.args[0] for call in xadds], ['core:events:customer', 'core:events:loan', 'core:events:customer'])
+        self.assertEqual(xadds[1].args[1]['aggregate_id'], loan.loan_id)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_relay_returns_while_another_relay_holds_the_lock(self):
+        """
+        Test that a relay started during another relay's drain publishes nothing and leaves the events queued.
+        """
+        Customer.objects.create(
+            first_name="Event", last_name="User", age=28, phone_number="9876501234",
+            monthly_salary=Decimal('60000'), approved_limit=Decimal('2200000')
+        )
+        client = mock.MagicMock()
+        with mock.patch('core.outbox.get_redis', return_value=client), \
+                mock.patch('core.outbox.acquire_relay_lock', return_value=False):
+            self.assertEqual(relay_outbox_events(), "Relayed 0 events.")
+        client.pipeline.assert_not_called()
+        self.assertEqual(OutboxEvent.objects.count(), 1)
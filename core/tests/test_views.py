@@ -2,11 +2,21 @@
 from rest_framework.test import APITestCase
 from rest_framework import status
 from decimal import Decimal
-from core.models import Customer, Loan
+from core.models import Customer, Loan, CreditPolicy
+from core.credit import invalidate_credit_policy
+from core.analytics import refresh_exposure_analytics
+from core.tasks import create_loan_task
+from core.views import duplicate_phone_response, mark_duplicate_phones
+from unittest import mock
 from datetime import date
 from django.utils import timezone
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from core.tests import LOCAL_CACHES
 import datetime
 
+@override_settings(CACHES=LOCAL_CACHES)
 class CreditSystemAPITest(APITestCase):
 
     def setUp(self):
@@ -153,4 +163,282 @@ class CreditSystemAPITest(APITestCase):
         response = self.client.get(f'/api/view-loans/{self.high_income_customer_id}/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIsInstance(response.data, list)
-        self.assertGreaterEqual(len(response.data), 1)
\ No newline at end of file
+        self.assertGreaterEqual(len(response.data), 1)
+
+    def test_register_customer_batch(self):
+        """
+        Test that a batch registration creates valid customers in input order and reports bad rows.
+        """
+        batch = [
+            self.customer_data_low_income,
+            {"first_name": "Bad", "last_name": "Row", "age": "not-a-number", "monthly_income": Decimal('20000'), "phone_number": "1112223334"},
+            {**self.customer_data_high_income, "phone_number": "5556667778"},
+        ]
+        response = self.client.post('/api/register/batch/', batch, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['failed'], 1)
+        results = response.data['results']
+        self.assertEqual(results[0]['approved_limit'], Decimal('400000'))
+        self.assertIsNone(results[1]['customer_id'])
+        self.assertIn('age', results[1]['errors'])
+        self.assertEqual(Customer.objects.get(customer_id=results[2]['customer_id']).phone_number, "5556667778")
+        self.assertLess(results[0]['customer_id'], results[2]['customer_id'])
+
+    def test_exposure_analytics(self):
+        """
+        Test that the exposure analytics are grouped by salary band and approval year and cached.
+        """
+        cache.clear()
+        # A cold cache queues one refresh instead of computing in the request
+        with mock.patch('core.views.refresh_exposure_analytics.delay') as delay:
+            response = self.client.get('/api/analytics/exposure/')
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.client.get('/api/analytics/exposure/')
+        delay.assert_called_once_with()
+
+        refresh_exposure_analytics()
+        response = self.client.get('/api/analytics/exposure/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        row = response.data['exposure'][0]
+        self.assertEqual(row['salary_band'], "100000-200000")
+        self.assertEqual(row['approval_year'], timezone.now().year)
+        self.assertEqual(row['active_loans'], 1)
+        self.assertEqual(row['active_loan_volume'], Decimal('500000'))
+        self.assertAlmostEqual(row['avg_emi_to_salary'], 0.23)
+        slabs = {item['salary_band']: item['customers'] for item in response.data['credit_score_slabs']}
+        self.assertEqual(slabs["100000-200000"]['above_50'], 1)
+
+        # A new loan is not visible until the cached result is refreshed
+        Loan.objects.create(
+            customer_id=self.high_income_customer_id,
+            loan_amount=Decimal('100000'),
+            tenure=12,
+            interest_rate=Decimal('10.00'),
+            monthly_installment=Decimal('9000'),
+            date_of_approval=timezone.now().date(),
+            end_date=timezone.now().date() + datetime.timedelta(days=30 * 12)
+        )
+        response = self.client.get('/api/analytics/exposure/')
+        self.assertEqual(response.data['exposure'][0]['active_loans'], 1)
+
+    def test_export_loans_csv(self):
+        """
+        Test that the loans export is staff-only and streams CSV rows filtered by approval date.
+        """
+        Loan.objects.create(
+            customer_id=self.high_income_customer_id,
+            loan_amount=Decimal('10000'),
+            tenure=12,
+            interest_rate=Decimal('10.00'),
+            monthly_installment=Decimal('1000'),
+            date_of_approval=date(2023, 1, 1),
+            end_date=date(2024, 1, 1)
+        )
+        response = self.client.get('/api/export/loans/', {'approved_from': '2024-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        staff = get_user_model().objects.create_user('analyst', password='password', is_staff=True)
+        self.client.force_authenticate(staff)
+        response = self.client.get('/api/export/loans/', {'approved_from': '2024-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:2], ['loan_id', 'customer_id'])
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith(f"{self.test_loan.loan_id},{self.high_income_customer_id},"))
+
+    def test_check_eligibility_uses_updated_credit_policy(self):
+        """
+        Test that a changed credit policy is applied without restarting the worker.
+        """
+        self.addCleanup(invalidate_credit_policy)
+        loan_request = {
+            "customer_id": self.high_income_customer_id,
+            "loan_amount": Decimal('500000'),
+            "interest_rate": Decimal('8.0'),
+            "tenure": 12
+        }
+        response = self.client.post('/api/check-eligibility/', loan_request, format='json')
+        self.assertEqual(response.data['corrected_interest_rate'], 8.0)
+
+        # Require a minimum rate of 9% for every approved score
+        policy = CreditPolicy.objects.get(is_active=True)
+        policy.slabs.filter(min_credit_score=Decimal('50.00')).update(min_interest_rate=Decimal('9.00'))
+        policy.save()
+
+        response = self.client.post('/api/check-eligibility/', loan_request, format='json')
+        self.assertTrue(response.data['approval'])
+        self.assertEqual(response.data['corrected_interest_rate'], 9.0)
+        self.assertIn("corrected to 9.00%", response.data['message'])
+
+    def test_create_loan_async_accepted(self):
+        """
+        Test that an admitted async loan request is enqueued and answered with a polling URL.
+        """
+        loan_request = {
+            "customer_id": self.high_income_customer_id,
+            "loan_amount": Decimal('500000'),
+            "interest_rate": Decimal('8.0'),
+            "tenure": 12
+        }
+        with mock.patch('core.views.admit_loan_request', return_value=(True, 0)), \
+                mock.patch('core.views.create_loan_task.delay') as delay:
+            delay.return_value.id = 'task-123'
+            response = self.client.post('/api/create-loan/async/', loan_request, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertTrue(response.data['status_url'].endswith('/api/create-loan/status/task-123/'))
+        self.assertEqual(response['Location'], response.data['status_url'])
+        delay.assert_called_once_with(self.high_income_customer_id, '500000.00', '8.00', 12)
+
+    def test_create_loan_async_sheds_load(self):
+        """
+        Test that a request refused by admission control gets 429 with Retry-After and is not enqueued.
+        """
+        loan_request = {
+            "customer_id": self.high_income_customer_id,
+            "loan_amount": Decimal('500000'),
+            "interest_rate": Decimal('8.0'),
+            "tenure": 12
+        }
+        with mock.patch('core.views.admit_loan_request', return_value=(False, 3)), \
+                mock.patch('core.views.create_loan_task.delay') as delay:
+            response = self.client.post('/api/create-loan/async/', loan_request, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '3')
+        delay.assert_not_called()
+
+    def test_create_loan_task(self):
+        """
+        Test that the async task runs the create-loan logic and returns a JSON-safe result.
+        """
+        result = create_loan_task(self.high_income_customer_id, '500000.00', '8.00', 12)
+        self.assertEqual(result['status_code'], status.HTTP_201_CREATED)
+        self.assertTrue(result['data']['loan_approved'])
+        self.assertIsInstance(result['data']['monthly_installment'], float)
+        self.assertTrue(Loan.objects.filter(loan_id=result['data']['loan_id']).exists())
+
+    def test_create_loan_status_only_serves_loan_tasks(self):
+        """
+        Test that polling returns a finished loan result and 404 for another task's ID.
+        """
+        loan_result = mock.Mock(ready=lambda: True, successful=lambda: True, result={"status_code": 201, "data": {"loan_id": 7}})
+        loan_result.name = create_loan_task.name
+        with mock.patch('core.views.AsyncResult', return_value=loan_result):
+            response = self.client.get('/api/create-loan/status/task-123/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], "completed")
+        self.assertEqual(response.data['result'], {"loan_id": 7})
+
+        ingestion_result = mock.Mock(ready=lambda: True, successful=lambda: True, result="Data ingestion completed successfully.")
+        ingestion_result.name = 'core.tasks.ingest_customer_and_loan_data'
+        with mock.patch('core.views.AsyncResult', return_value=ingestion_result):
+            response = self.client.get('/api/create-loan/status/task-456/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_register_customer_duplicate_phone(self):
+        """
+        Test that registering an existing phone number in another format is rejected.
+        """
+        duplicate = {**self.customer_data_low_income, "phone_number": "+91 12345-67890"}
+        response = self.client.post('/api/register/', duplicate, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['customer_id'], self.high_income_customer_id)
+
+        batch = [self.customer_data_low_income, duplicate, {**self.customer_data_high_income, "phone_number": "0987654321"}]
+        response = self.client.post('/api/register/batch/', batch, format='json')
+        self.assertEqual(response.data['created'], 1)
+        self.assertIn('phone_number', response.data['results'][1]['errors'])
+        self.assertIn('phone_number', response.data['results'][2]['errors'])
+
+    def test_register_customer_concurrent_duplicate_phone(self):
+        """
+        Test that a registration racing another one with the same number gets a 409 from the unique constraint.
+        """
+        def register_concurrently(phone_normalized):
+            # Another request inserts the number after this request's lookup found nothing
+            if not Customer.objects.filter(phone_normalized=phone_normalized).exists():
+                Customer.objects.create(
+                    first_name="Other", last_name="Request", age=40, phone_number=phone_normalized,
+                    monthly_salary=Decimal('30000'), approved_limit=Decimal('1100000'), registered=True
+                )
+                return None
+            return duplicate_phone_response(phone_normalized)
+
+        with mock.patch('core.views.duplicate_phone_response', side_effect=register_concurrently):
+            response = self.client.post('/api/register/', self.customer_data_low_income, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Customer.objects.filter(phone_normalized="0987654321").count(), 1)
+
+        batch = [{**self.customer_data_low_income, "phone_number": "5550001111"}, {**self.customer_data_low_income, "phone_number": "5550002222"}]
+        real_mark_duplicate_phones = mark_duplicate_phones
+
+        def mark_then_register_concurrently(items):
+            real_mark_duplicate_phones(items)
+            if not Customer.objects.filter(phone_normalized="5550002222").exists():
+                Customer.objects.create(
+                    first_name="Other", last_name="Request", age=40, phone_number="5550002222",
+                    monthly_salary=Decimal('30000'), approved_limit=Decimal('1100000'), registered=True
+                )
+
+        with mock.patch('core.views.mark_duplicate_phones', side_effect=mark_then_register_concurrently):
+            response = self.client.post('/api/register/batch/', batch, format='json')
+        self.assertEqual(response.data['created'], 1)
+        self.assertIn('phone_number', response.data['results'][1]['errors'])
+        self.assertEqual(Customer.objects.filter(phone_normalized="5550002222").count(), 1)
+
+    def test_customer_lookup_by_phone(self):
+        """
+        Test that customers can be found by a phone number in any common format.
+        """
+        response = self.client.get('/api/customers/lookup/', {'phone': '01234567890'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['customer_id'], self.high_income_customer_id)
+
+        response = self.client.get('/api/customers/lookup/', {'phone': '5550000000'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_check_eligibility_grid_matches_single_checks(self):
+        """
+        Test that every cell of the eligibility grid matches the single eligibility check.
+        """
+        grid_request = {
+            "customer_id": self.high_income_customer_id,
+            "loan_amounts": [Decimal('100000'), Decimal('500000'), Decimal('5000000')],
+            "interest_rates": [Decimal('0'), Decimal('8.0'), Decimal('14.5')],
+            "tenures": [6, 12, 36]
+        }
+        response = self.client.post('/api/check-eligibility/grid/', grid_request, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['approval'][2], [False, False, False])
+
+        for i, loan_amount in enumerate(grid_request['loan_amounts']):
+            for j, interest_rate in enumerate(grid_request['interest_rates']):
+                for k, tenure in enumerate(grid_request['tenures']):
+                    single = self.client.post('/api/check-eligibility/', {
+                        "customer_id": self.high_income_customer_id,
+                        "loan_amount": loan_amount,
+                        "interest_rate": interest_rate,
+                        "tenure": tenure
+                    }, format='json').data
+                    with self.subTest(loan_amount=loan_amount, interest_rate=interest_rate, tenure=tenure):
+                        self.assertEqual(response.data['approval'][i][j], single['approval'])
+                        self.assertEqual(response.data['corrected_interest_rates'][j], single['corrected_interest_rate'])
+                        if single['approval']:
+                            self.assertEqual(response.data['monthly_installments'][i][j][k], float(single['monthly_installment']))
+                        else:
+                            self.assertIsNone(response.data['monthly_installments'][i][j][k])
+
+    def test_check_eligibility_grid_limits_cells(self):
+        """
+        Test that a grid with too many combinations is rejected.
+        """
+        grid_request = {
+            "customer_id": self.high_income_customer_id,
+            "loan_amounts": list(range(1000, 101000, 1000)),
+            "interest_rates": list(range(1, 11)),
+            "tenures": [12, 24, 36]
+        }
+        with self.settings(ELIGIBILITY_GRID_MAX_CELLS=2500):
+            response = self.client.post('/api/check-eligibility/grid/', grid_request, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
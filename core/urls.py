@@ -2,16 +2,30 @@
 from django.urls import path
 from .views import (
     RegisterCustomerAPI,
+    RegisterCustomerBatchAPI,
     CheckEligibilityAPI,
+    EligibilityGridAPI,
     CreateLoanAPI,
+    CreateLoanAsyncAPI,
+    CreateLoanStatusAPI,
     ViewLoanAPI,
-    ViewCustomerLoansAPI
+    ViewCustomerLoansAPI,
+    ExposureAnalyticsAPI,
+    ExportDataAPI,
+    CustomerLookupAPI
 )
 
 urlpatterns = [
     path('register/', RegisterCustomerAPI.as_view(), name='register-customer'),
+    path('register/batch/', RegisterCustomerBatchAPI.as_view(), name='register-customer-batch'),
     path('check-eligibility/', CheckEligibilityAPI.as_view(), name='check-eligibility'),
+    path('check-eligibility/grid/', EligibilityGridAPI.as_view(), name='check-eligibility-grid'),
     path('create-loan/', CreateLoanAPI.as_view(), name='create-loan'),
+    path('create-loan/async/', CreateLoanAsyncAPI.as_view(), name='create-loan-async'),
+    path('create-loan/status/<str:task_id>/', CreateLoanStatusAPI.as_view(), name='create-loan-status'),
     path('view-loan/<int:loan_id>/', ViewLoanAPI.as_view(), name='view-loan'),
     path('view-loans/<int:customer_id>/', ViewCustomerLoansAPI.as_view(), name='view-loans'),
+    path('analytics/exposure/', ExposureAnalyticsAPI.as_view(), name='exposure-analytics'),
+    path('export/<str:dataset>/', ExportDataAPI.as_view(), name='export-data'),
+    path('customers/lookup/', CustomerLookupAPI.as_view(), name='customer-lookup'),
 ]
\ No newline at end of file
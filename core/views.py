@@ -1,19 +1,35 @@
 # core/views.py
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
-from django.db.models import Sum, Q, F
-from django.utils import timezone
-from .models import Customer, Loan
+from rest_framework import serializers, status
+from rest_framework.permissions import IsAdminUser
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from celery.result import AsyncResult
+from redis import RedisError
+from .admission import admit_loan_request
+from .tasks import create_loan_task, refresh_exposure_analytics
+from .models import ArchivedLoan, Customer, Loan, OutboxEvent, normalize_phone_number
+from .loans import calculate_eligibility, calculate_eligibility_grid, create_loan
+from .analytics import claim_exposure_refresh, get_exposure_analytics
+from .exports import EXPORT_DATASETS, iter_csv_lines
 from .serializers import (
     RegisterCustomerSerializer,
+    RegisterCustomerBatchSerializer,
     CheckEligibilitySerializer,
+    EligibilityGridSerializer,
     CreateLoanSerializer,
     LoanDetailSerializer,
-    CustomerLoansSerializer
+    CustomerLoansSerializer,
+    CustomerLoanSerializer,
+    CustomerLoansFilterSerializer,
+    ArchivedLoanDetailSerializer,
+    ArchivedCustomerLoansSerializer,
+    ExportFilterSerializer,
+    CustomerLookupSerializer
 )
 import math
-from decimal import Decimal
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from collections import OrderedDict
@@ -30,6 +46,11 @@ register_customer_schema = openapi.Schema(
     ]),
 )
 
+register_customer_batch_schema = openapi.Schema(
+    type=openapi.TYPE_ARRAY,
+    items=register_customer_schema,
+)
+
 check_eligibility_schema = openapi.Schema(
     type=openapi.TYPE_OBJECT,
     properties=OrderedDict([
@@ -40,6 +61,16 @@ check_eligibility_schema = openapi.Schema(
     ]),
 )
 
+eligibility_grid_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties=OrderedDict([
+        ('customer_id', openapi.Schema(type=openapi.TYPE_INTEGER)),
+        ('loan_amounts', openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_NUMBER))),
+        ('interest_rates', openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_NUMBER))),
+        ('tenures', openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER))),
+    ]),
+)
+
 create_loan_schema = openapi.Schema(
     type=openapi.TYPE_OBJECT,
     properties=OrderedDict([
@@ -50,117 +81,88 @@ create_loan_schema = openapi.Schema(
     ]),
 )
 
-def calculate_eligibility(customer, loan_amount, interest_rate, tenure):
+# Number of customers inserted per bulk_create statement in batch registration
+REGISTER_BATCH_CHUNK_SIZE = 1000
+
+# Times a batch is checked and inserted again after a concurrent registration took one of its numbers
+REGISTER_BATCH_ATTEMPTS = 3
+
+DUPLICATE_PHONE_MESSAGE = "A customer with this phone number already exists."
+
+def duplicate_phone_response(phone_normalized):
     """
-    Helper function to calculate eligibility and credit score.
-    Returns a dictionary of eligibility data.
+    409 response naming the customer that already has this normalized phone
+    number, or None if there is no such customer.
     """
-    # Check sum of all current EMIs > 50% of monthly salary
-    active_loans = Loan.objects.filter(
-        customer=customer,
-        emis_paid_on_time__lt=F('tenure'),
-        end_date__gte=timezone.now().date()
+    existing_customer_id = (
+        Customer.objects.filter(phone_normalized=phone_normalized)
+        .values_list('customer_id', flat=True)
+        .first()
     )
-    total_current_emi = active_loans.aggregate(Sum('monthly_installment'))['monthly_installment__sum'] or Decimal('0.00')
-    
-    if total_current_emi > (customer.monthly_salary / Decimal(2)):
-        return {
-            "approval": False,
-            "message": "Loan not approved. Sum of current EMIs exceeds 50% of monthly salary.",
-            "corrected_interest_rate": float(interest_rate),
-            "monthly_installment": 0
-        }
+    if existing_customer_id is None:
+        return None
+    return Response({
+        "error": DUPLICATE_PHONE_MESSAGE,
+        "customer_id": existing_customer_id
+    }, status=status.HTTP_409_CONFLICT)
 
-    # Credit Score Calculation
-    credit_score = Decimal('100.00')
-    
-    # Past Loans paid on time (consider only closed loans for this metric)
-    past_loans_paid_on_time = Loan.objects.filter(
-        customer=customer,
-        emis_paid_on_time__gte=F('tenure'),
-        end_date__lt=timezone.now().date()
-    ).count()
-    credit_score += Decimal(str(past_loans_paid_on_time * 5))
-    
-    # No of loans taken in past (total loans, active or closed)
-    total_loans_taken = Loan.objects.filter(customer=customer).count()
-    if total_loans_taken > 0:
-        credit_score -= Decimal(str(total_loans_taken * 5))
-    
-    # Loan activity in current year (number of loans approved in current year)
-    current_year = timezone.now().year
-    loans_this_year = Loan.objects.filter(customer=customer, date_of_approval__year=current_year).count()
-    credit_score += Decimal(str(loans_this_year * 3))
-    
-    # Loan approved volume (sum of all current active loans)
-    total_active_loan_amount = active_loans.aggregate(Sum('loan_amount'))['loan_amount__sum'] or Decimal('0.00')
-    
-    if total_active_loan_amount > customer.approved_limit:
-        credit_score = Decimal('0.00')
-    else:
-        if customer.approved_limit > 0:
-            volume_ratio = total_active_loan_amount / customer.approved_limit
-            credit_score += Decimal(str(int(volume_ratio * 10)))
-            
-    credit_score = max(Decimal('0.00'), min(Decimal('100.00'), credit_score))
-    
-    # Eligibility based on credit score and interest rate rules
-    approval = False
-    corrected_interest_rate = Decimal(str(interest_rate))
-    message = ""
-    
-    if credit_score > Decimal('50.00'):
-        approval = True
-    elif Decimal('50.00') >= credit_score > Decimal('30.00'):
-        approval = True
-        if corrected_interest_rate < Decimal('12.00'):
-            corrected_interest_rate = Decimal('12.00')
-            message = f"Interest rate corrected to {corrected_interest_rate}% (minimum for this credit score slab)."
-    elif Decimal('30.00') >= credit_score > Decimal('10.00'):
-        approval = True
-        if corrected_interest_rate < Decimal('16.00'):
-            corrected_interest_rate = Decimal('16.00')
-            message = f"Interest rate corrected to {corrected_interest_rate}% (minimum for this credit score slab)."
-    else:
-        approval = False
-        message = "Loan not approved due to low credit score (below 10)."
-        
-    if loan_amount > customer.approved_limit:
-        approval = False
-        message = "Loan not approved. Requested loan amount exceeds customer's approved limit."
-        
-    monthly_installment = Decimal('0.00')
-    if approval:
-        monthly_rate = (corrected_interest_rate / Decimal('12.00')) / Decimal('100.00')
-        if monthly_rate > 0:
-            monthly_installment = (loan_amount * monthly_rate) / (Decimal('1') - (Decimal('1') + monthly_rate)**(-tenure))
-        else:
-            monthly_installment = loan_amount / Decimal(tenure)
-            
-    return {
-        "approval": approval,
-        "message": message,
-        "corrected_interest_rate": float(corrected_interest_rate),
-        "monthly_installment": round(monthly_installment, 2)
-    }
+def mark_duplicate_phones(items):
+    """
+    Replaces batch items whose phone number is already registered, or repeats an
+    earlier item's, with a ValidationError. One indexed lookup covers the batch.
+    """
+    phones = [
+        normalize_phone_number(item['phone_number']) if isinstance(item, dict) else None
+        for item in items
+    ]
+    seen = set(
+        Customer.objects.filter(phone_normalized__in=[phone for phone in phones if phone])
+        .values_list('phone_normalized', flat=True)
+    )
+    for index, phone in enumerate(phones):
+        if phone is None:
+            continue
+        if phone in seen:
+            items[index] = serializers.ValidationError({"phone_number": [DUPLICATE_PHONE_MESSAGE]})
+        seen.add(phone)
+
+def calculate_approved_limits(monthly_incomes):
+    """
+    Approved limit is 36 * monthly income, rounded up to the nearest lakh.
+    Accepts a list of incomes and returns the limits in the same order.
+    """
+    return [math.ceil((36 * income) / 100000) * 100000 for income in monthly_incomes]
 
 class RegisterCustomerAPI(APIView):
     @swagger_auto_schema(request_body=register_customer_schema)
     def post(self, request, *args, **kwargs):
         serializer = RegisterCustomerSerializer(data=request.data)
         if serializer.is_valid():
+            phone_normalized = normalize_phone_number(serializer.validated_data['phone_number'])
+            duplicate_response = duplicate_phone_response(phone_normalized)
+            if duplicate_response is not None:
+                return duplicate_response
+
             monthly_income = serializer.validated_data['monthly_income']
-            approved_limit = math.ceil((36 * monthly_income) / 100000) * 100000
+            approved_limit = calculate_approved_limits([monthly_income])[0]
             
-            customer = Customer.objects.create(
-                first_name=serializer.validated_data['first_name'],
-                last_name=serializer.validated_data['last_name'],
-                age=serializer.validated_data['age'],
-                phone_number=serializer.validated_data['phone_number'],
-                monthly_salary=monthly_income,
-                approved_limit=approved_limit,
-                current_debt=0
-            )
+            try:
+                customer = Customer.objects.create(
+                    first_name=serializer.validated_data['first_name'],
+                    last_name=serializer.validated_data['last_name'],
+                    age=serializer.validated_data['age'],
+                    phone_number=serializer.validated_data['phone_number'],
+                    monthly_salary=monthly_income,
+                    approved_limit=approved_limit,
+                    current_debt=0,
+                    registered=True
+                )
+            except IntegrityError:
+                # A concurrent registration with the same number committed after the lookup
+                duplicate_response = duplicate_phone_response(phone_normalized)
+                if duplicate_response is None:
+                    raise
+                return duplicate_response
             response_data = {
                 "customer_id": customer.customer_id,
                 "name": f"{customer.first_name} {customer.last_name}",
@@ -172,6 +174,74 @@ class RegisterCustomerAPI(APIView):
             return Response(response_data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class RegisterCustomerBatchAPI(APIView):
+    @swagger_auto_schema(request_body=register_customer_batch_schema)
+    def post(self, request, *args, **kwargs):
+        serializer = RegisterCustomerBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        items = serializer.validated_data
+
+        for attempt in range(REGISTER_BATCH_ATTEMPTS):
+            mark_duplicate_phones(items)
+            valid_items = [item for item in items if isinstance(item, dict)]
+            approved_limits = iter(calculate_approved_limits([item['monthly_income'] for item in valid_items]))
+
+            customers = [
+                Customer(
+                    first_name=item['first_name'],
+                    last_name=item['last_name'],
+                    age=item['age'],
+                    phone_number=item['phone_number'],
+                    phone_normalized=normalize_phone_number(item['phone_number']),
+                    monthly_salary=item['monthly_income'],
+                    approved_limit=next(approved_limits),
+                    current_debt=0,
+                    registered=True
+                )
+                for item in valid_items
+            ]
+            for customer in customers:
+                customer.content_hash = customer.compute_content_hash()
+            try:
+                with transaction.atomic():
+                    for start in range(0, len(customers), REGISTER_BATCH_CHUNK_SIZE):
+                        Customer.objects.bulk_create(customers[start:start + REGISTER_BATCH_CHUNK_SIZE])
+                    OutboxEvent.objects.record_many(customers, OutboxEvent.CREATED)
+                break
+            except IntegrityError:
+                # A concurrent registration took one of the numbers; the next lookup marks it
+                if attempt == REGISTER_BATCH_ATTEMPTS - 1:
+                    return Response(
+                        {"error": "Concurrent registrations used the same phone numbers. Retry the batch."},
+                        status=status.HTTP_409_CONFLICT
+                    )
+
+        # bulk_create keeps the input order, so created customers line up with the valid items
+        created = iter(customers)
+        results = []
+        for item in items:
+            if isinstance(item, dict):
+                customer = next(created)
+                results.append({
+                    "customer_id": customer.customer_id,
+                    "approved_limit": customer.approved_limit,
+                })
+            else:
+                results.append({
+                    "customer_id": None,
+                    "errors": item.detail,
+                })
+
+        response_data = {
+            "created": len(customers),
+            "failed": len(items) - len(customers),
+            "results": results
+        }
+        response_status = status.HTTP_201_CREATED if customers else status.HTTP_400_BAD_REQUEST
+        return Response(response_data, status=response_status)
+
 class CheckEligibilityAPI(APIView):
     @swagger_auto_schema(request_body=check_eligibility_schema)
     def post(self, request, *args, **kwargs):
@@ -206,6 +276,36 @@ class CheckEligibilityAPI(APIView):
             return Response(response_data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class EligibilityGridAPI(APIView):
+    @swagger_auto_schema(request_body=eligibility_grid_schema)
+    def post(self, request, *args, **kwargs):
+        serializer = EligibilityGridSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            customer = Customer.objects.get(customer_id=serializer.validated_data['customer_id'])
+        except Customer.DoesNotExist:
+            return Response({"error": "Customer not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        loan_amounts = serializer.validated_data['loan_amounts']
+        interest_rates = serializer.validated_data['interest_rates']
+        tenures = serializer.validated_data['tenures']
+        grid = calculate_eligibility_grid(customer, loan_amounts, interest_rates, tenures)
+
+        response_data = {
+            "customer_id": customer.customer_id,
+            "approved_limit": grid['approved_limit'],
+            "loan_amounts": [float(amount) for amount in loan_amounts],
+            "interest_rates": [float(rate) for rate in interest_rates],
+            "tenures": tenures,
+            "corrected_interest_rates": grid['corrected_interest_rates'],
+            "approval": grid['approval'],
+            "monthly_installments": grid['monthly_installments'],
+            "message": grid['message']
+        }
+        return Response(response_data, status=status.HTTP_200_OK)
+
 class CreateLoanAPI(APIView):
     @swagger_auto_schema(request_body=create_loan_schema)
     def post(self, request, *args, **kwargs):
@@ -216,53 +316,58 @@ class CreateLoanAPI(APIView):
             interest_rate = serializer.validated_data['interest_rate']
             tenure = serializer.validated_data['tenure']
 
-            try:
-                customer = Customer.objects.get(customer_id=customer_id)
-            except Customer.DoesNotExist:
-                return Response({"error": "Customer not found."}, status=status.HTTP_404_NOT_FOUND)
+            response_data, response_status = create_loan(customer_id, loan_amount, interest_rate, tenure)
+            return Response(response_data, status=response_status)
 
-            eligibility_data = calculate_eligibility(
-                customer, 
-                loan_amount, 
-                interest_rate, 
-                tenure
-            )
-            
-            if not eligibility_data['approval']:
-                return Response({
-                    "loan_id": None,
-                    "customer_id": customer.customer_id,
-                    "loan_approved": False,
-                    "message": eligibility_data["message"],
-                    "monthly_installment": None
-                }, status=status.HTTP_200_OK)
-            
-            corrected_interest_rate = Decimal(str(eligibility_data.get('corrected_interest_rate', interest_rate)))
-            monthly_installment = Decimal(str(eligibility_data.get('monthly_installment', Decimal('0.00'))))
-
-            loan = Loan.objects.create(
-                customer=customer,
-                loan_amount=loan_amount,
-                tenure=tenure,
-                interest_rate=corrected_interest_rate,
-                monthly_installment=monthly_installment,
-                date_of_approval=timezone.now().date(),
-                end_date=timezone.now().date() + timezone.timedelta(days=30 * tenure),
-                emis_paid_on_time=0
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class CreateLoanAsyncAPI(APIView):
+    @swagger_auto_schema(request_body=create_loan_schema)
+    def post(self, request, *args, **kwargs):
+        serializer = CreateLoanSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            admitted, retry_after = admit_loan_request()
+        except RedisError:
+            return Response({"error": "Loan queue unavailable."}, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={"Retry-After": "5"})
+        if not admitted:
+            return Response(
+                {"error": "Too many loan requests. Retry later."},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(retry_after)}
             )
-            
-            customer.current_debt += loan_amount
-            customer.save()
 
-            return Response({
-                "loan_id": loan.loan_id,
-                "customer_id": customer.customer_id,
-                "loan_approved": True,
-                "message": "Loan approved successfully.",
-                "monthly_installment": round(monthly_installment, 2)
-            }, status=status.HTTP_201_CREATED)
+        task = create_loan_task.delay(
+            serializer.validated_data['customer_id'],
+            str(serializer.validated_data['loan_amount']),
+            str(serializer.validated_data['interest_rate']),
+            serializer.validated_data['tenure']
+        )
+        status_url = request.build_absolute_uri(reverse('create-loan-status', args=[task.id]))
+        return Response(
+            {"task_id": task.id, "status": "pending", "status_url": status_url},
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": status_url}
+        )
 
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+class CreateLoanStatusAPI(APIView):
+    def get(self, request, task_id, *args, **kwargs):
+        result = AsyncResult(task_id, app=create_loan_task.app)
+        # Other tasks' results share the backend; a pending ID cannot be told apart yet
+        if result.ready() and result.name != create_loan_task.name:
+            return Response({"error": "Loan request not found."}, status=status.HTTP_404_NOT_FOUND)
+        if result.successful():
+            return Response({
+                "task_id": task_id,
+                "status": "completed",
+                "status_code": result.result["status_code"],
+                "result": result.result["data"]
+            }, status=status.HTTP_200_OK)
+        if result.failed():
+            return Response({"task_id": task_id, "status": "failed"}, status=status.HTTP_200_OK)
+        return Response({"task_id": task_id, "status": "pending"}, status=status.HTTP_200_OK)
 
 class ViewLoanAPI(APIView):
     def get(self, request, loan_id, *args, **kwargs):
@@ -271,14 +376,78 @@ class ViewLoanAPI(APIView):
             serializer = LoanDetailSerializer(loan)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Loan.DoesNotExist:
+            pass
+        # Closed loans may have been moved to the archive
+        try:
+            loan = ArchivedLoan.objects.select_related('customer').get(loan_id=loan_id)
+            serializer = ArchivedLoanDetailSerializer(loan)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        except ArchivedLoan.DoesNotExist:
             return Response({"error": "Loan not found."}, status=status.HTTP_404_NOT_FOUND)
 
 class ViewCustomerLoansAPI(APIView):
+    @swagger_auto_schema(query_serializer=CustomerLoansFilterSerializer)
     def get(self, request, customer_id, *args, **kwargs):
+        filter_serializer = CustomerLoansFilterSerializer(data=request.query_params)
+        if not filter_serializer.is_valid():
+            return Response(filter_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         try:
             customer = Customer.objects.get(customer_id=customer_id)
             loans = Loan.objects.filter(customer=customer)
             serializer = CustomerLoansSerializer(loans, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            data = serializer.data
+            if filter_serializer.validated_data['include_archived']:
+                archived_loans = ArchivedLoan.objects.filter(customer=customer).order_by('loan_id')
+                data = [*data, *ArchivedCustomerLoansSerializer(archived_loans, many=True).data]
+            return Response(data, status=status.HTTP_200_OK)
         except Customer.DoesNotExist:
-            return Response({"error": "Customer not found."}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+            return Response({"error": "Customer not found."}, status=status.HTTP_404_NOT_FOUND)
+
+class ExposureAnalyticsAPI(APIView):
+    def get(self, request, *args, **kwargs):
+        data = get_exposure_analytics()
+        if data is None:
+            # Cold cache: one request queues the computation instead of running it here
+            if claim_exposure_refresh():
+                refresh_exposure_analytics.delay()
+            return Response(
+                {"error": "Exposure analytics are being computed. Retry later."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "30"}
+            )
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class ExportDataAPI(APIView):
+    # Full-table extracts include names and phone numbers, so only staff may run them
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(query_serializer=ExportFilterSerializer)
+    def get(self, request, dataset, *args, **kwargs):
+        if dataset not in EXPORT_DATASETS:
+            return Response({"error": "Unknown export dataset."}, status=status.HTTP_404_NOT_FOUND)
+        serializer = ExportFilterSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            iter_csv_lines(dataset, **serializer.validated_data),
+            content_type='text/csv'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{dataset}.csv"'
+        return response
+
+
+class CustomerLookupAPI(APIView):
+    @swagger_auto_schema(query_serializer=CustomerLookupSerializer)
+    def get(self, request, *args, **kwargs):
+        serializer = CustomerLookupSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        customers = Customer.objects.filter(
+            phone_normalized=normalize_phone_number(serializer.validated_data['phone'])
+        ).order_by('customer_id')
+        if not customers:
+            return Response({"error": "Customer not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(CustomerLoanSerializer(customers, many=True).data, status=status.HTTP_200_OK)
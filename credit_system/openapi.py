@@ -0,0 +1,55 @@
+# credit_system/openapi.py
+import os
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.template.loader import render_to_string
+from django.views import View
+from drf_yasg import openapi
+
+api_info = openapi.Info(
+    title="Credit Approval System API",
+    default_version='v1',
+    description="API documentation for the Credit Approval System backend",
+    terms_of_service="https://www.google.com/policies/terms/",
+    contact=openapi.Contact(email="contact@creditapproval.local"),
+    license=openapi.License(name="BSD License"),
+)
+
+def openapi_schema(request):
+    """
+    Serves the OpenAPI document generated at build time by
+    `manage.py generate_swagger`. Falls back to generating it on the fly when
+    the file has not been built, e.g. in a fresh checkout.
+    """
+    if os.path.exists(settings.OPENAPI_SCHEMA_PATH):
+        return FileResponse(open(settings.OPENAPI_SCHEMA_PATH, 'rb'), content_type='application/json')
+
+    from drf_yasg.views import get_schema_view
+    from rest_framework import permissions
+
+    schema_view = get_schema_view(api_info, public=True, permission_classes=[permissions.AllowAny])
+    return schema_view.without_ui(cache_timeout=0)(request, format='json')
+
+class SchemaUIView(View):
+    """
+    Renders the Swagger UI or ReDoc page. The page loads the schema from
+    SPEC_URL, so no schema is generated while rendering it.
+    """
+    renderer = None
+
+    def get(self, request, *args, **kwargs):
+        # The renderers pull in the schema validators, so load them on first use
+        from drf_yasg.renderers import ReDocRenderer, SwaggerUIRenderer
+
+        renderer_class = {'swagger': SwaggerUIRenderer, 'redoc': ReDocRenderer}[self.renderer]
+        renderer = renderer_class()
+        context = {'request': request}
+        renderer.set_context(context)
+        context['title'] = api_info.title
+        return HttpResponse(render_to_string(renderer.template, context, request))
+
+class SwaggerUIView(SchemaUIView):
+    renderer = 'swagger'
+
+class ReDocView(SchemaUIView):
+    renderer = 'redoc'
@@ -92,10 +92,74 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# OpenAPI document generated once at build time with `manage.py generate_swagger`
+OPENAPI_SCHEMA_PATH = os.path.join(BASE_DIR, 'openapi.json')
+SWAGGER_SETTINGS = {
+    'DEFAULT_INFO': 'credit_system.openapi.api_info',
+    'SPEC_URL': 'openapi-schema',
+}
+REDOC_SETTINGS = {
+    'SPEC_URL': 'openapi-schema',
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get("CACHE_URL", "redis://redis:6379/1"),
+    }
+}
+
+# How often each worker checks whether the credit policy has changed
+CREDIT_POLICY_CHECK_SECONDS = int(os.environ.get("CREDIT_POLICY_CHECK_SECONDS", 5))
+
+# Largest number of amount x rate x tenure combinations accepted by the eligibility grid
+ELIGIBILITY_GRID_MAX_CELLS = int(os.environ.get("ELIGIBILITY_GRID_MAX_CELLS", 2500))
+
+# Portfolio exposure analytics
+EXPOSURE_ANALYTICS_REFRESH_SECONDS = int(os.environ.get("EXPOSURE_ANALYTICS_REFRESH_SECONDS", 300))
+EXPOSURE_SALARY_BANDS = [25000, 50000, 100000, 200000]
+
+# How often fully repaid loans are moved to the archive table
+LOAN_ARCHIVAL_INTERVAL_SECONDS = int(os.environ.get("LOAN_ARCHIVAL_INTERVAL_SECONDS", 86400))
+
+# How often recorded change events are published
+OUTBOX_RELAY_INTERVAL_SECONDS = int(os.environ.get("OUTBOX_RELAY_INTERVAL_SECONDS", 5))
+
 
 # Celery Configuration
 CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://redis:6379/0")
 CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", "redis://redis:6379/0")
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
-CELERY_RESULT_SERIALIZER = "json"
\ No newline at end of file
+CELERY_RESULT_SERIALIZER = "json"
+# Stores the task name with each result, so the loan status API can tell its own results apart
+CELERY_RESULT_EXTENDED = True
+CELERY_TASK_ROUTES = {
+    "core.tasks.create_loan_task": {"queue": "loans"},
+}
+CELERY_BEAT_SCHEDULE = {
+    "refresh-exposure-analytics": {
+        "task": "core.tasks.refresh_exposure_analytics",
+        "schedule": EXPOSURE_ANALYTICS_REFRESH_SECONDS,
+    },
+    "archive-closed-loans": {
+        "task": "core.tasks.archive_closed_loans",
+        "schedule": LOAN_ARCHIVAL_INTERVAL_SECONDS,
+    },
+    "relay-outbox-events": {
+        "task": "core.tasks.relay_outbox_events",
+        "schedule": OUTBOX_RELAY_INTERVAL_SECONDS,
+    },
+}
+
+# Customer and Loan change events are relayed to Redis streams named <prefix>:<customer|loan>
+OUTBOX_REDIS_URL = CELERY_BROKER_URL
+OUTBOX_STREAM_PREFIX = "core:events"
+OUTBOX_STREAM_MAXLEN = int(os.environ.get("OUTBOX_STREAM_MAXLEN", 100000))
+
+# Admission control for asynchronous loan creation
+ADMISSION_REDIS_URL = CELERY_BROKER_URL
+ASYNC_LOAN_QUEUE = "loans"
+ASYNC_LOAN_MAX_QUEUE_DEPTH = int(os.environ.get("ASYNC_LOAN_MAX_QUEUE_DEPTH", 1000))
+ASYNC_LOAN_ADMISSION_RATE = float(os.environ.get("ASYNC_LOAN_ADMISSION_RATE", 50))
+ASYNC_LOAN_ADMISSION_BURST = int(os.environ.get("ASYNC_LOAN_ADMISSION_BURST", 100))
@@ -1,34 +1,20 @@
 # credit_system/urls.py
 from django.contrib import admin
 from django.urls import path, include
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
+from .openapi import ReDocView, SwaggerUIView, openapi_schema
 
 # Import settings and static for serving static files in development
 from django.conf import settings
 from django.conf.urls.static import static
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Credit Approval System API",
-        default_version='v1',
-        description="API documentation for the Credit Approval System backend",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="contact@creditapproval.local"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=[permissions.AllowAny],
-)
-
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('core.urls')),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    path('swagger.json', openapi_schema, name='openapi-schema'),
+    path('swagger/', SwaggerUIView.as_view(), name='schema-swagger-ui'),
+    path('redoc/', ReDocView.as_view(), name='schema-redoc'),
 ]
 
 # ONLY add this to serve static files in development mode (when DEBUG is True)
 if settings.DEBUG:
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
+    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
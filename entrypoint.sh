@@ -7,6 +7,9 @@ while ! nc -z db 5432; do
 done
 echo "PostgreSQL started"
 
+# Rebuild the OpenAPI document on every start, since a bind mount can hide the image's copy
+python manage.py generate_swagger --overwrite openapi.json
+
 # Migrate and collectstatic
 python manage.py migrate --noinput
 python manage.py collectstatic --noinput
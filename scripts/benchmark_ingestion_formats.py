@@ -0,0 +1,86 @@
+"""
+Compares parse time and peak memory of the ingestion readers per input format.
+
+Usage:
+    python scripts/benchmark_ingestion_formats.py --rows 100000
+
+Synthetic loan files are written once per format, then each file is read with
+core.ingestion.read_ingestion_file in a freshly spawned process. Peak memory is
+the tracemalloc peak (Python and numpy allocations) plus the peak of the Arrow
+memory pool, which tracemalloc does not see.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WRITERS = {
+    '.xlsx': lambda df, path: df.to_excel(path, index=False),
+    '.csv': lambda df, path: df.to_csv(path, index=False),
+    '.parquet': lambda df, path: df.to_parquet(path, index=False),
+}
+
+def build_loans(rows):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    approval = pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 1500, rows), unit='D')
+    return pd.DataFrame({
+        "Customer ID": rng.integers(1, 50000, rows),
+        "Loan ID": np.arange(1, rows + 1),
+        "Loan Amount": rng.integers(10000, 1000000, rows).astype(float),
+        "Tenure": rng.integers(6, 180, rows),
+        "Interest Rate": rng.uniform(8, 20, rows).round(2),
+        "Monthly payment": rng.integers(1000, 50000, rows).astype(float),
+        "EMIs paid on Time": rng.integers(0, 180, rows),
+        "Date of Approval": approval.strftime('%d-%m-%Y'),
+        "End Date": (approval + pd.DateOffset(years=2)).strftime('%d-%m-%Y'),
+        "Branch Notes": ["free text that ingestion never reads"] * rows,
+    })
+
+def measure(path, queue):
+    from core.ingestion import LOAN_COLUMNS, read_ingestion_file
+    # Import the optional readers up front so their import cost is not counted as parse memory
+    import openpyxl  # noqa: F401
+    import pyarrow
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    df = read_ingestion_file(path, LOAN_COLUMNS)
+    elapsed = time.perf_counter() - start
+    _, python_peak = tracemalloc.get_traced_memory()
+    arrow_peak = pyarrow.default_memory_pool().max_memory() or 0
+    queue.put((len(df), elapsed, (python_peak + arrow_peak) / (1024 * 1024)))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--formats', nargs='+', default=list(WRITERS))
+    args = parser.parse_args()
+
+    df = build_loans(args.rows)
+    # Spawned processes start with their own, empty Arrow memory pool
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        print(f"{'format':<10}{'rows':>10}{'size MB':>10}{'parse s':>10}{'peak MB':>10}")
+        for extension in args.formats:
+            path = os.path.join(tmpdir, f"loans{extension}")
+            WRITERS[extension](df, path)
+
+            queue = context.Queue()
+            process = context.Process(target=measure, args=(path, queue))
+            process.start()
+            rows, elapsed, peak_mb = queue.get()
+            process.join()
+
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            print(f"{extension:<10}{rows:>10}{size_mb:>10.1f}{elapsed:>10.3f}{peak_mb:>10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Reports the import cost of web and worker startup using `python -X importtime`.
+
+Usage:
+    python scripts/benchmark_startup.py --top 20
+
+The same imports a Gunicorn worker (URLconf) and a Celery worker (task
+autodiscovery) perform are run in a fresh interpreter. The total startup import
+time and the modules with the largest cumulative import time are printed.
+core/tests/test_startup.py runs the same imports and fails if pandas or the
+other ingestion-only libraries are loaded.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP_SCRIPT = """
+import django
+django.setup()
+import credit_system.urls
+from credit_system.celery import app
+app.loader.import_default_modules()
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--top', type=int, default=20, help='Number of modules to list.')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'credit_system.settings')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        rows.append((int(cumulative), module.rstrip()))
+
+    # Top-level imports (no indentation) add up to the whole startup cost
+    total = sum(cumulative for cumulative, module in rows if not module.startswith('  ', 1))
+    print(f"Total startup import time: {total / 1000:.1f} ms")
+    print(f"{'cumulative ms':>14}  module")
+    for cumulative, module in sorted(rows, reverse=True)[:args.top]:
+        print(f"{cumulative / 1000:>14.1f}  {module.strip()}")
+
+if __name__ == '__main__':
+    main()